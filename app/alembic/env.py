@@ -6,13 +6,14 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-from app.core.database import Base, sync_engine
+from app.core.database import Base, get_sync_engine
 
 from app.app_users.models import User, PasswordResetToken
-from app.app_goals.models import Goal
+from app.app_goals.models import Goal, GoalDailyStats
 from app.app_tasks.models import Task
 from app.app_reports.models import MonthlyReport, WeeklyReport
-from app.app_subscriptions.models import StripeSubscription
+from app.app_subscriptions.models import StripeEvent, StripeSubscription
+from app.app_emails.models import EmailOutbox
 
 config = context.config
 
@@ -36,7 +37,7 @@ def run_migrations_offline():
 
 
 def run_migrations_online():
-    connectable = sync_engine
+    connectable = get_sync_engine()
 
     with connectable.connect() as connection:
         context.configure(
@@ -0,0 +1,32 @@
+"""Added keyset pagination indexes
+
+Revision ID: 3c7a9e1f5b2d
+Revises: d2b79dc1785e
+Create Date: 2026-10-17 09:12:40.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c7a9e1f5b2d'
+down_revision: Union[str, Sequence[str], None] = 'd2b79dc1785e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_tasks_goal_id_assigned_date_id', 'tasks', ['goal_id', 'assigned_date', 'id'], unique=False)
+    op.create_index('ix_weekly_reports_goal_id_week_start_id', 'weekly_reports', ['goal_id', 'week_start', 'id'], unique=False)
+    op.create_index('ix_monthly_reports_goal_id_year_month_id', 'monthly_reports', ['goal_id', 'year', 'month', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_monthly_reports_goal_id_year_month_id', table_name='monthly_reports')
+    op.drop_index('ix_weekly_reports_goal_id_week_start_id', table_name='weekly_reports')
+    op.drop_index('ix_tasks_goal_id_assigned_date_id', table_name='tasks')
@@ -0,0 +1,49 @@
+"""Added goal daily stats
+
+Revision ID: 4e8b2f6a9c13
+Revises: 7a1d4c92e8f0
+Create Date: 2026-10-17 12:41:09.318254
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e8b2f6a9c13'
+down_revision: Union[str, Sequence[str], None] = '7a1d4c92e8f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('goal_daily_stats',
+    sa.Column('goal_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('assigned', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('done', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('missed', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['goal_id'], ['goals.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('goal_id', 'day')
+    )
+    op.execute(
+        """
+        INSERT INTO goal_daily_stats (goal_id, day, assigned, done, missed)
+        SELECT goal_id,
+               assigned_date,
+               count(*),
+               count(*) FILTER (WHERE status = 'done'),
+               count(*) FILTER (WHERE status = 'missed')
+        FROM tasks
+        GROUP BY goal_id, assigned_date
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('goal_daily_stats')
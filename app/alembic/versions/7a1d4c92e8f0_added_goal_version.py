@@ -0,0 +1,28 @@
+"""Added goal version
+
+Revision ID: 7a1d4c92e8f0
+Revises: 3c7a9e1f5b2d
+Create Date: 2026-10-17 11:03:27.904163
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a1d4c92e8f0'
+down_revision: Union[str, Sequence[str], None] = '3c7a9e1f5b2d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('goals', sa.Column('version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('goals', 'version')
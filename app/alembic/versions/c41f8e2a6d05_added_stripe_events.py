@@ -0,0 +1,50 @@
+"""Added stripe events
+
+Revision ID: c41f8e2a6d05
+Revises: 9b6c2d4e7f18
+Create Date: 2026-10-17 15:22:48.104377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41f8e2a6d05'
+down_revision: Union[str, Sequence[str], None] = '9b6c2d4e7f18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('stripe_events',
+    sa.Column('stripe_event_id', sa.String(length=255), nullable=False),
+    sa.Column('type', sa.String(length=255), nullable=False),
+    sa.Column('stripe_subscription_id', sa.String(length=255), nullable=True),
+    sa.Column('stripe_created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('payload', sa.Text(), nullable=False),
+    sa.Column('status', sa.Enum('pending', 'processed', 'failed', name='stripeeventstatus'), nullable=False),
+    sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('stripe_event_id')
+    )
+    op.create_index('ix_stripe_events_status_next_attempt_at', 'stripe_events', ['status', 'next_attempt_at'], unique=False)
+    op.create_index('ix_stripe_events_subscription_created', 'stripe_events', ['stripe_subscription_id', 'stripe_created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_stripe_events_subscription_created', table_name='stripe_events')
+    op.drop_index('ix_stripe_events_status_next_attempt_at', table_name='stripe_events')
+    op.drop_table('stripe_events')
+    sa.Enum(name='stripeeventstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,35 @@
+"""Added email sending status
+
+Revision ID: d5a8e3c1f07b
+Revises: c41f8e2a6d05
+Create Date: 2026-10-17 23:20:14.518302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a8e3c1f07b'
+down_revision: Union[str, Sequence[str], None] = 'c41f8e2a6d05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("ALTER TYPE emailstatus ADD VALUE IF NOT EXISTS 'sending' AFTER 'pending'")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Postgres cannot drop an enum value, so rebuild the type without it
+    op.drop_index('ux_email_outbox_pending_recipient_template', table_name='email_outbox', postgresql_where=sa.text("status = 'pending'"))
+    op.execute("UPDATE email_outbox SET status = 'pending' WHERE status = 'sending'")
+    op.execute("ALTER TYPE emailstatus RENAME TO emailstatus_old")
+    sa.Enum('pending', 'sent', 'failed', name='emailstatus').create(op.get_bind())
+    op.execute("ALTER TABLE email_outbox ALTER COLUMN status TYPE emailstatus USING status::text::emailstatus")
+    op.execute("DROP TYPE emailstatus_old")
+    op.create_index('ux_email_outbox_pending_recipient_template', 'email_outbox', ['to_email', 'template'], unique=True, postgresql_where=sa.text("status = 'pending'"))
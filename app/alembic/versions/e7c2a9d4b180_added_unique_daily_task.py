@@ -0,0 +1,62 @@
+"""Added unique daily task per goal
+
+Revision ID: e7c2a9d4b180
+Revises: d5a8e3c1f07b
+Create Date: 2026-10-17 16:05:12.348913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7c2a9d4b180'
+down_revision: Union[str, Sequence[str], None] = 'd5a8e3c1f07b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # keep the most progressed task of each duplicated day and rebuild that day's counters
+    op.execute("""
+        CREATE TEMPORARY TABLE duplicate_task_days AS
+        SELECT goal_id, assigned_date FROM tasks
+        GROUP BY goal_id, assigned_date HAVING count(*) > 1
+    """)
+    op.execute("""
+        DELETE FROM tasks WHERE id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY goal_id, assigned_date
+                    ORDER BY status = 'done' DESC, status = 'missed' DESC, id
+                ) AS position
+                FROM tasks
+                WHERE (goal_id, assigned_date) IN (SELECT goal_id, assigned_date FROM duplicate_task_days)
+            ) ranked
+            WHERE position > 1
+        )
+    """)
+    op.execute("""
+        UPDATE goal_daily_stats AS stats
+        SET assigned = counts.assigned, done = counts.done, missed = counts.missed
+        FROM (
+            SELECT goal_id, assigned_date,
+                count(*) AS assigned,
+                count(*) FILTER (WHERE status = 'done') AS done,
+                count(*) FILTER (WHERE status = 'missed') AS missed
+            FROM tasks
+            WHERE (goal_id, assigned_date) IN (SELECT goal_id, assigned_date FROM duplicate_task_days)
+            GROUP BY goal_id, assigned_date
+        ) counts
+        WHERE stats.goal_id = counts.goal_id AND stats.day = counts.assigned_date
+    """)
+    op.execute("DROP TABLE duplicate_task_days")
+    op.create_index('ux_tasks_goal_id_assigned_date', 'tasks', ['goal_id', 'assigned_date'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ux_tasks_goal_id_assigned_date', table_name='tasks')
@@ -1,21 +1,21 @@
 from datetime import datetime, timedelta, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Response, status
-from fastapi_limiter.depends import RateLimiter
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_requests
-
 from app.core.config import settings
-from app.core.database import get_db
-from app.core.security import create_access_token, verify_password
+from app.core.rate_limit import RateLimit
+from app.core.database import commit, get_db
+from app.core.passwords import verify_and_update_password, verify_password
+from app.core.security import create_access_token
 from app.core.deps import get_current_user
-from app.lib.resend import send_reset_link
+from app.lib.google_auth import GoogleTokenError, verify_google_id_token
 
 from app.app_users.models import User
-from app.app_users.schemas import AuthRequest, ForgotPasswordRequest, GoogleLoginRequest, LoginResponse, MessageResponse, ResetPasswordRequest, UserResponse, PasswordResetTokenRequest
-from app.app_users.crud import create_oauth_user, create_reset_token, create_user, delete_reset_tokens, get_reset_token_by_value, get_user_by_email, get_user_by_id, reset_password_action, soft_delete_user
+from app.app_users.schemas import AuthRequest, ForgotPasswordRequest, GoogleLoginRequest, LoginResponse, MessageResponse, OAuthRequest, ResetPasswordRequest, UserResponse, PasswordResetTokenRequest
+from app.app_emails.crud import enqueue_email
+from app.app_emails.templates import password_reset_url
+from app.app_users.crud import create_oauth_user, create_reset_token, create_user, delete_reset_tokens, get_reset_token_by_value, get_user_by_email, get_user_by_id, reset_password_action, soft_delete_user, update_password_hash
 from app.app_goals.crud import get_active_goal, soft_delete_goal
 from app.app_tasks.utils import remove_user_tasks
 
@@ -23,27 +23,34 @@ from app.app_tasks.utils import remove_user_tasks
 router = APIRouter()
 
 
-@router.post("/register", response_model=UserResponse, dependencies=[Depends(RateLimiter(times=10, seconds=60))])
+@router.post("/register", response_model=UserResponse, dependencies=[Depends(RateLimit("auth"))])
 async def register(user_in: AuthRequest, db: AsyncSession = Depends(get_db)):
 	existing = await get_user_by_email(db, user_in.email)
 	if existing:
 		raise HTTPException(status_code=400, detail="Email already registered")
 
 	user = await create_user(db, user_in)
+	await commit(db)
 	return user
 
 
-@router.post("/login", response_model=LoginResponse, dependencies=[Depends(RateLimiter(times=10, seconds=60))])
+@router.post("/login", response_model=LoginResponse, dependencies=[Depends(RateLimit("auth"))])
 async def login(user_in: AuthRequest, db: AsyncSession = Depends(get_db)):
 	user = await get_user_by_email(db, user_in.email)
-	if not user or not user.password_hash or not verify_password(user_in.password, user.password_hash):
+	if not user or not user.password_hash:
+		raise HTTPException(status_code=400, detail="Invalid email or password")
+	valid, new_hash = await verify_and_update_password(user_in.password, user.password_hash)
+	if not valid:
 		raise HTTPException(status_code=400, detail="Invalid email or password")
+	if new_hash:
+		await update_password_hash(db, user.id, new_hash)
+		await commit(db)
 	token = create_access_token(subject=user.email)
 
 	return LoginResponse(token=token, user=user)
 
-@router.post("/forgot-password", response_model=MessageResponse, dependencies=[Depends(RateLimiter(times=10, seconds=60))])
-async def forgot_password(payload: ForgotPasswordRequest, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_db)):
+@router.post("/forgot-password", response_model=MessageResponse, dependencies=[Depends(RateLimit("auth"))])
+async def forgot_password(payload: ForgotPasswordRequest, db: AsyncSession = Depends(get_db)):
 	email = payload.email
 	if not email:
 		raise HTTPException(status_code=400, detail="Email required")
@@ -56,12 +63,13 @@ async def forgot_password(payload: ForgotPasswordRequest, background_tasks: Back
 	token_value = create_access_token(subject=user.email, expires_minutes=settings.password_reset_expire_minutes)
 	expires_at = datetime.now(timezone.utc) + timedelta(minutes=settings.password_reset_expire_minutes)
 	await create_reset_token(db, user.id, PasswordResetTokenRequest(token=token_value, expires_at=expires_at))
+	await enqueue_email(db, email, "password_reset", {"reset_url": password_reset_url(token_value)})
+	await commit(db)
 
-	background_tasks.add_task(send_reset_link, email, token_value)
 	return MessageResponse(message="Email has been sent to your email")
 
 
-@router.post("/reset-password", response_model=MessageResponse, dependencies=[Depends(RateLimiter(times=10, seconds=60))])
+@router.post("/reset-password", response_model=MessageResponse, dependencies=[Depends(RateLimit("auth"))])
 async def reset_password(payload: ResetPasswordRequest, db: AsyncSession = Depends(get_db)):
 	token_value = payload.token
 	new_password = payload.new_password
@@ -76,48 +84,47 @@ async def reset_password(payload: ResetPasswordRequest, db: AsyncSession = Depen
 	if not user:
 		raise HTTPException(status_code=400, detail="User not found")
 
-	if verify_password(new_password, user.password_hash):
+	if user.password_hash and await verify_password(new_password, user.password_hash):
 		raise HTTPException(status_code=400, detail="Old Password and New Password cannot be same")
 
 	await reset_password_action(db, user, token, new_password)
+	await commit(db)
 	return MessageResponse(message="Password has been reset successfully")
 
 
-@router.get("/user", response_model=UserResponse, dependencies=[Depends(RateLimiter(times=10, seconds=60))])
+@router.get("/user", response_model=UserResponse, dependencies=[Depends(RateLimit("read"))])
 async def get_user(db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
 	return current_user
 
 
-@router.delete("/", status_code=status.HTTP_204_NO_CONTENT, response_model=None, dependencies=[Depends(RateLimiter(times=10, seconds=60))])
+@router.delete("/", status_code=status.HTTP_204_NO_CONTENT, response_model=None, dependencies=[Depends(RateLimit("write"))])
 async def delete_user(db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
 	await soft_delete_user(db, current_user)
 	goal = await get_active_goal(db, current_user.id)
 	if goal:
 		remove_user_tasks(goal.celery_task_ids)
 		await soft_delete_goal(db, goal)
+	await commit(db)
 	return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
-@router.post("/google-login", response_model=LoginResponse, dependencies=[Depends(RateLimiter(times=10, seconds=60))])
+@router.post("/google-login", response_model=LoginResponse, dependencies=[Depends(RateLimit("auth"))])
 async def google_login(google_token: GoogleLoginRequest, db: AsyncSession = Depends(get_db)):
 	tok = google_token.token
-	print(google_token)
-	print(tok)
 	if not tok:
 		raise HTTPException(status_code=400, detail="Missing token")
+
 	try:
-		idinfo = id_token.verify_oauth2_token(tok, google_requests.Request(), settings.google_client_id)
+		idinfo = await verify_google_id_token(tok, settings.google_client_id)
 		email = idinfo["email"]
 		provider_id = idinfo["sub"]
-	except Exception:
+	except (GoogleTokenError, KeyError):
 		raise HTTPException(status_code=400, detail="Invalid Google token")
 
 	user = await get_user_by_email(db, email)
 	if not user:
-		user = await create_oauth_user(db, {
-			"email": email,
-			"provider_id": provider_id
-		})
+		user = await create_oauth_user(db, OAuthRequest(email=email, provider_id=provider_id))
+		await commit(db)
 
 	token = create_access_token(subject=user.email)
 	return LoginResponse(token=token, user=user)
\ No newline at end of file
@@ -1,18 +1,19 @@
 from typing import List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from fastapi_limiter.depends import RateLimiter
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
-from app.core.deps import get_current_active_subscriber
+from app.core.rate_limit import RateLimit
+from app.core.database import commit, get_db
+from app.core.deps import get_current_active_subscriber, page_params
+from app.common.pagination import Page, PageParams
+from app.common.etag import etag_matches, goal_etag, not_modified
 from app.app_users.models import User
-from app.app_goals.crud import create_new_goal, get_active_goal, get_goal, get_goals, soft_delete_goal, update_goal
-from app.app_goals.schemas import GoalRequest, GoalResponse, GoalStatus, GoalUpdate
+from app.app_goals.crud import create_new_goal, get_active_goal, get_goal, get_goal_daily_stats, get_goals, soft_delete_goal
+from app.app_goals.schemas import GoalDayStatsResponse, GoalProgressResponse, GoalRequest, GoalResponse, GoalStatus
 from app.app_tasks.schemas import TaskResponse
 from app.app_tasks.crud import list_goal_tasks
-from app.app_tasks.scheduler import schedule_user_task
 from app.app_tasks.utils import remove_user_tasks
 from app.app_reports.schemas import MonthlyReportResponse, WeeklyReportResponse
 from app.app_reports.crud import list_monthly_reports, list_weekly_reports
@@ -20,28 +21,22 @@ from app.app_reports.crud import list_monthly_reports, list_weekly_reports
 
 router = APIRouter()
 
-@router.post("/create", response_model=GoalResponse, dependencies=[Depends(RateLimiter(times=10, seconds=60))])
+@router.post("/create", response_model=GoalResponse, dependencies=[Depends(RateLimit("write"))])
 async def create_goal(data: GoalRequest, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_active_subscriber)):
 	existing = await get_active_goal(db, current_user.id)
 	if existing:
 		raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="User already has an active goal")
 	goal = await create_new_goal(db, user_id=current_user.id, goal_in=data)
-	
-	try:
-		task_ids = schedule_user_task(current_user.id)
-	except:
-		raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An error occured during task scheduling")
-	
-	await update_goal(db, db_goal=goal, goal_in=GoalUpdate(celery_task_ids=task_ids))
+	await commit(db)
 	return goal
 
 
-@router.get("/", response_model=List[GoalResponse], dependencies=[Depends(RateLimiter(times=10, seconds=60))])
+@router.get("/", response_model=List[GoalResponse], dependencies=[Depends(RateLimit("read"))])
 async def list_goals(include_deleted: bool = Query(True), db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_active_subscriber)):
 	return await get_goals(db, user_id=current_user.id, include_deleted=include_deleted)
 
 
-@router.get("/{goal_id}", response_model=GoalResponse, dependencies=[Depends(RateLimiter(times=10, seconds=60))])
+@router.get("/{goal_id}", response_model=GoalResponse, dependencies=[Depends(RateLimit("read"))])
 async def get_individual_goal(goal_id: UUID, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_active_subscriber)):
 	goal = await get_goal(db, goal_id)
 	if not goal or goal.user_id != current_user.id:
@@ -49,7 +44,7 @@ async def get_individual_goal(goal_id: UUID, db: AsyncSession = Depends(get_db),
 	return goal
 
 
-@router.delete("/{goal_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(RateLimiter(times=10, seconds=60))])
+@router.delete("/{goal_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(RateLimit("write"))])
 async def delete_goal(goal_id: str, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_active_subscriber)):
 	goal = await get_goal(db, goal_id)
 	if not goal or goal.user_id != current_user.id or goal.status == GoalStatus.deleted:
@@ -57,28 +52,59 @@ async def delete_goal(goal_id: str, db: AsyncSession = Depends(get_db), current_
 	if getattr(goal, "celery_task_ids", None):
 		remove_user_tasks(goal.celery_task_ids)
 	await soft_delete_goal(db, db_goal=goal)
+	await commit(db)
 	return None
 
 
-@router.get("/{goal_id}/tasks", response_model=List[TaskResponse], dependencies=[Depends(RateLimiter(times=10, seconds=60))])
-async def get_goal_tasks(goal_id: UUID, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_active_subscriber)):
+@router.get("/{goal_id}/progress", response_model=GoalProgressResponse, dependencies=[Depends(RateLimit("read"))])
+async def get_goal_progress(goal_id: UUID, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_active_subscriber)):
 	goal = await get_goal(db, goal_id)
 	if not goal or goal.user_id != current_user.id:
 		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Goal not found")
-	return await list_goal_tasks(db, goal.id)
+	days = await get_goal_daily_stats(db, goal.id)
+	return GoalProgressResponse(
+		goal_id=goal.id,
+		assigned=sum(day.assigned for day in days),
+		done=sum(day.done for day in days),
+		missed=sum(day.missed for day in days),
+		days=[GoalDayStatsResponse.model_validate(day, from_attributes=True) for day in days],
+	)
+
+
+@router.get("/{goal_id}/tasks", response_model=Page[TaskResponse], dependencies=[Depends(RateLimit("read"))])
+async def get_goal_tasks(goal_id: UUID, request: Request, response: Response, page: PageParams = Depends(page_params), db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_active_subscriber)):
+	goal = await get_goal(db, goal_id)
+	if not goal or goal.user_id != current_user.id:
+		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Goal not found")
+	etag = goal_etag(goal, "tasks", page)
+	if etag_matches(request, etag):
+		return not_modified(etag)
+	tasks, next_cursor = await list_goal_tasks(db, goal.id, page)
+	response.headers["ETag"] = etag
+	return Page[TaskResponse](items=tasks, next_cursor=next_cursor)
 
 
-@router.get("/{goal_id}/reports/weekly", response_model=List[WeeklyReportResponse], dependencies=[Depends(RateLimiter(times=10, seconds=60))])
-async def get_goal_weekly_reports(goal_id: UUID, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_active_subscriber)):
+@router.get("/{goal_id}/reports/weekly", response_model=Page[WeeklyReportResponse], dependencies=[Depends(RateLimit("read"))])
+async def get_goal_weekly_reports(goal_id: UUID, request: Request, response: Response, page: PageParams = Depends(page_params), db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_active_subscriber)):
 	goal = await get_goal(db, goal_id)
 	if not goal or goal.user_id != current_user.id:
 		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Goal not found")
-	return await list_weekly_reports(db, goal.id)
+	etag = goal_etag(goal, "weekly_reports", page)
+	if etag_matches(request, etag):
+		return not_modified(etag)
+	reports, next_cursor = await list_weekly_reports(db, goal.id, page)
+	response.headers["ETag"] = etag
+	return Page[WeeklyReportResponse](items=reports, next_cursor=next_cursor)
 
 
-@router.get("/{goal_id}/reports/monthly", response_model=List[MonthlyReportResponse], dependencies=[Depends(RateLimiter(times=10, seconds=60))])
-async def get_goal_monthly_reports(goal_id: UUID, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_active_subscriber)):
+@router.get("/{goal_id}/reports/monthly", response_model=Page[MonthlyReportResponse], dependencies=[Depends(RateLimit("read"))])
+async def get_goal_monthly_reports(goal_id: UUID, request: Request, response: Response, page: PageParams = Depends(page_params), db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_active_subscriber)):
 	goal = await get_goal(db, goal_id)
 	if not goal or goal.user_id != current_user.id:
 		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Goal not found")
-	return await list_monthly_reports(db, goal.id)
\ No newline at end of file
+	etag = goal_etag(goal, "monthly_reports", page)
+	if etag_matches(request, etag):
+		return not_modified(etag)
+	reports, next_cursor = await list_monthly_reports(db, goal.id, page)
+	response.headers["ETag"] = etag
+	return Page[MonthlyReportResponse](items=reports, next_cursor=next_cursor)
\ No newline at end of file
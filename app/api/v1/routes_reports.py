@@ -1,11 +1,11 @@
-from typing import List
-
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi_limiter.depends import RateLimiter
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.rate_limit import RateLimit
 from app.core.database import get_db
-from app.core.deps import get_current_active_subscriber
+from app.core.deps import get_current_active_subscriber, page_params
+from app.common.pagination import Page, PageParams
+from app.common.etag import etag_matches, goal_etag, not_modified
 from app.app_users.models import User
 from app.app_goals.crud import get_active_goal
 from app.app_reports.schemas import MonthlyReportResponse, WeeklyReportResponse
@@ -14,17 +14,27 @@ from app.app_reports.crud import list_monthly_reports, list_weekly_reports
 
 router = APIRouter()
 
-@router.get("/weekly-report", response_model=List[WeeklyReportResponse], dependencies=[Depends(RateLimiter(times=10, seconds=60))])
-async def list_weekly_reports_route(db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_active_subscriber)):
+@router.get("/weekly-report", response_model=Page[WeeklyReportResponse], dependencies=[Depends(RateLimit("read"))])
+async def list_weekly_reports_route(request: Request, response: Response, page: PageParams = Depends(page_params), db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_active_subscriber)):
 	goal = await get_active_goal(db, current_user.id)
 	if not goal:
 		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Goal not found")
-	return await list_weekly_reports(db, goal.id)
+	etag = goal_etag(goal, "weekly_reports", page)
+	if etag_matches(request, etag):
+		return not_modified(etag)
+	reports, next_cursor = await list_weekly_reports(db, goal.id, page)
+	response.headers["ETag"] = etag
+	return Page[WeeklyReportResponse](items=reports, next_cursor=next_cursor)
 
 
-@router.get("/monthly-report", response_model=List[MonthlyReportResponse], dependencies=[Depends(RateLimiter(times=10, seconds=60))])
-async def list_monthly_reports_route(db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_active_subscriber)):
+@router.get("/monthly-report", response_model=Page[MonthlyReportResponse], dependencies=[Depends(RateLimit("read"))])
+async def list_monthly_reports_route(request: Request, response: Response, page: PageParams = Depends(page_params), db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_active_subscriber)):
 	goal = await get_active_goal(db, current_user.id)
 	if not goal:
 		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Goal not found")
-	return await list_monthly_reports(db, goal.id)
+	etag = goal_etag(goal, "monthly_reports", page)
+	if etag_matches(request, etag):
+		return not_modified(etag)
+	reports, next_cursor = await list_monthly_reports(db, goal.id, page)
+	response.headers["ETag"] = etag
+	return Page[MonthlyReportResponse](items=reports, next_cursor=next_cursor)
@@ -1,17 +1,15 @@
 import logging
 from datetime import datetime, timezone
-from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Request
-from fastapi_limiter.depends import RateLimiter
 from starlette.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-import stripe
-
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.rate_limit import RateLimit
+from app.core.database import commit, get_db
 from app.core.deps import get_current_active_subscriber, get_current_user
+from app.lib.stripe_client import get_stripe
 from app.app_users.models import User
 from app.app_subscriptions.models import SubscriptionStatus
 from app.app_subscriptions.schemas import (
@@ -21,32 +19,19 @@ from app.app_subscriptions.schemas import (
     SubscriptionActionResponse,
     SubscriptionRequest
 )
-from app.app_subscriptions.crud import create_subscription, get_user_subscription, is_subscription_active, upsert_subscription_from_stripe
+from app.app_subscriptions.crud import create_subscription, get_user_subscription, is_subscription_active, record_stripe_event, upsert_subscription_from_stripe
 
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-def _extract_user_id(*objects) -> Optional[str]:
-    for obj in objects:
-        if not obj:
-            continue
-        metadata = obj.get("metadata", {})
-        if metadata and metadata.get("user_id"):
-            try:
-                return metadata["user_id"]
-            except (ValueError, TypeError):
-                continue
-    return None
-
-
-@router.post('/create-checkout-session', response_model=CheckoutSessionResponse, dependencies=[Depends(RateLimiter(times=10, seconds=60))])
+@router.post('/create-checkout-session', response_model=CheckoutSessionResponse, dependencies=[Depends(RateLimit("billing"))])
 async def create_checkout_session(
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user)
 ):
-  
+    stripe = get_stripe()
     try:
         db_subscription = await get_user_subscription(db, user.id)
         
@@ -64,6 +49,7 @@ async def create_checkout_session(
             )
             
             db_subscription = await create_subscription(db, subscription_in)
+            await commit(db)
         
         stripe_customer_id = db_subscription.stripe_customer_id
         
@@ -92,6 +78,7 @@ async def create_checkout_session(
 
 @router.post("/webhooks/stripe")
 async def stripe_webhook(request: Request, db: AsyncSession = Depends(get_db)):        
+    stripe = get_stripe()
     payload = await request.body()
     sig_header = request.headers.get("stripe-signature")
     webhook_secret = settings.stripe_webhook_secret
@@ -113,72 +100,15 @@ async def stripe_webhook(request: Request, db: AsyncSession = Depends(get_db)):
         logger.error(f"Invalid webhook signature: {str(e)}")
         raise HTTPException(status_code=400, detail="Invalid signature")
 
-    event_type = event.type
-    data = event.data.object
-    
-    logger.info(f"Processing Stripe webhook: {event_type}")
-
-    try:
-        if event_type == "checkout.session.completed":
-            sub_id = data.get("subscription")
-            
-            if sub_id:
-                stripe_sub = stripe.Subscription.retrieve(
-                    sub_id,
-                    expand=["items.data.price"]
-                )
-                
-                user_id = _extract_user_id(stripe_sub, data)
-                await upsert_subscription_from_stripe(db, stripe_sub, user_id=user_id)
-                logger.info(f"Subscription created for user {user_id}")
-
-        elif event_type == "customer.subscription.created":
-            user_id = _extract_user_id(data)
-            await upsert_subscription_from_stripe(db, data, user_id=user_id)
-            logger.info(f"Subscription created: {data['id']}")
-
-        elif event_type == "customer.subscription.updated":
-            user_id = _extract_user_id(data)
-            await upsert_subscription_from_stripe(db, data, user_id=user_id)
-            logger.info(f"Subscription updated: {data['id']}")
-
-        elif event_type == "customer.subscription.deleted":
-            user_id = _extract_user_id(data)
-            await upsert_subscription_from_stripe(db, data, user_id=user_id)
-            logger.info(f"Subscription deleted: {data['id']}")
-
-        elif event_type in ("invoice.paid", "invoice.payment_succeeded"):
-            sub_id = data.get("subscription")
-            
-            if sub_id:
-                stripe_sub = stripe.Subscription.retrieve(
-                    sub_id,
-                    expand=["items.data.price"]
-                )
-                user_id = _extract_user_id(stripe_sub)
-                await upsert_subscription_from_stripe(db, stripe_sub, user_id=user_id)
-                logger.info(f"Invoice paid for subscription: {sub_id}")
-
-        elif event_type == "invoice.payment_failed":
-            sub_id = data.get("subscription")
-            
-            if sub_id:
-                stripe_sub = stripe.Subscription.retrieve(
-                    sub_id,
-                    expand=["items.data.price"]
-                )
-                user_id = _extract_user_id(stripe_sub)
-                await upsert_subscription_from_stripe(db, stripe_sub, user_id=user_id)
-                logger.warning(f"Payment failed for subscription: {sub_id}")
-        else:
-            logger.info(f"Unhandled webhook event type: {event_type}")
-
-    except Exception as e:
-        logger.error(f"Error processing webhook {event_type}: {str(e)}")
+    # only persist here; app.app_subscriptions.tasks coalesces and applies them per subscription
+    if await record_stripe_event(db, event, payload.decode("utf-8")):
+        await commit(db)
+    else:
+        logger.info(f"Duplicate Stripe webhook ignored: {event.id}")
     return JSONResponse(status_code=200, content={"received": True})
 
 
-@router.get("/subscription/status", response_model=SubscriptionStatusResponse, dependencies=[Depends(RateLimiter(times=10, seconds=60))])
+@router.get("/subscription/status", response_model=SubscriptionStatusResponse, dependencies=[Depends(RateLimit("read"))])
 async def get_subscription_status(
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user)
@@ -212,11 +142,12 @@ async def get_subscription_status(
         trial_end=subscription.trial_end
     )
 
-@router.post("/subscription/cancel", response_model=SubscriptionCancelResponse, dependencies=[Depends(RateLimiter(times=10, seconds=60))])
+@router.post("/subscription/cancel", response_model=SubscriptionCancelResponse, dependencies=[Depends(RateLimit("billing"))])
 async def cancel_subscription(
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_active_subscriber)
 ):      
+    stripe = get_stripe()
     subscription = await get_user_subscription(db, user.id)
     
     if not subscription or not subscription.stripe_subscription_id:
@@ -229,6 +160,7 @@ async def cancel_subscription(
         )
         
         await upsert_subscription_from_stripe(db, stripe_sub, user_id=user.id)
+        await commit(db)
         
         return SubscriptionCancelResponse(
             message="Subscription will be cancelled at the end of subscription end",
@@ -240,11 +172,12 @@ async def cancel_subscription(
         raise HTTPException(status_code=400, detail="Failed to cancel subscription")
 
 
-@router.post("/subscription/reactivate", response_model=SubscriptionActionResponse, dependencies=[Depends(RateLimiter(times=10, seconds=60))])
+@router.post("/subscription/reactivate", response_model=SubscriptionActionResponse, dependencies=[Depends(RateLimit("billing"))])
 async def reactivate_subscription(
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_active_subscriber)
 ): 
+    stripe = get_stripe()
     subscription = await get_user_subscription(db, user.id)
     
     if not subscription or not subscription.stripe_subscription_id:
@@ -263,6 +196,7 @@ async def reactivate_subscription(
         )
         
         await upsert_subscription_from_stripe(db, stripe_sub, user_id=user.id)
+        await commit(db)
         
         return SubscriptionActionResponse(
             message="Subscription reactivated successfully"
@@ -1,46 +1,55 @@
 from datetime import datetime
-from typing import List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi_limiter.depends import RateLimiter
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-
-from app.app_users.crud import get_users_with_active_goal
-from app.core.database import get_db
-from app.core.deps import get_current_active_subscriber
+from app.core.rate_limit import RateLimit
+from app.core.database import commit, get_db
+from app.core.deps import get_current_active_subscriber, get_current_admin, page_params
+from app.common.pagination import Page, PageParams
+from app.common.etag import etag_matches, goal_etag, not_modified
 from app.app_users.models import User
 from app.app_users.schemas import MessageResponse
 from app.app_goals.models import GoalStatus
 from app.app_goals.schemas import GoalUpdate
 from app.app_goals.crud import get_active_goal, get_goal, update_goal
 from app.app_tasks.models import TaskStatus
-from app.app_tasks.schemas import TaskResponse
-from app.app_tasks.crud import create_daily_task_by_id, get_task, list_goal_tasks, update_task
+from app.app_tasks.schemas import FanoutJobResponse, TaskResponse
+from app.app_tasks.crud import get_task, list_goal_tasks, update_task
 from app.app_tasks.utils import remove_user_tasks
 
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[TaskResponse], dependencies=[Depends(RateLimiter(times=10, seconds=60))])
-async def list_tasks(db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_active_subscriber)):
+@router.get("/", response_model=Page[TaskResponse], dependencies=[Depends(RateLimit("read"))])
+async def list_tasks(request: Request, response: Response, page: PageParams = Depends(page_params), db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_active_subscriber)):
 	goal = await get_active_goal(db, current_user.id)
 	if not goal:
 		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Goal not found")
-	return await list_goal_tasks(db, goal.id)
+	etag = goal_etag(goal, "tasks", page)
+	if etag_matches(request, etag):
+		return not_modified(etag)
+	tasks, next_cursor = await list_goal_tasks(db, goal.id, page)
+	response.headers["ETag"] = etag
+	return Page[TaskResponse](items=tasks, next_cursor=next_cursor)
 
 
-@router.get("/{goal_id}", response_model=List[TaskResponse], dependencies=[Depends(RateLimiter(times=10, seconds=60))])
-async def list_tasks_by_goal(goal_id: UUID, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_active_subscriber)):
+@router.get("/{goal_id}", response_model=Page[TaskResponse], dependencies=[Depends(RateLimit("read"))])
+async def list_tasks_by_goal(goal_id: UUID, request: Request, response: Response, page: PageParams = Depends(page_params), db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_active_subscriber)):
 	goal = await get_goal(db, goal_id)
-	if not goal and goal.user_id == current_user.id:
+	if not goal or goal.user_id != current_user.id:
 		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Goal not found")
-	return await list_goal_tasks(db, goal.id)
+	etag = goal_etag(goal, "tasks", page)
+	if etag_matches(request, etag):
+		return not_modified(etag)
+	tasks, next_cursor = await list_goal_tasks(db, goal.id, page)
+	response.headers["ETag"] = etag
+	return Page[TaskResponse](items=tasks, next_cursor=next_cursor)
 
 
-@router.patch("/status/{task_id}", response_model=MessageResponse, dependencies=[Depends(RateLimiter(times=10, seconds=60))])
+@router.patch("/status/{task_id}", response_model=MessageResponse, dependencies=[Depends(RateLimit("write"))])
 async def update_task_status(task_id: UUID, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_active_subscriber)):
 	task = await get_task(db, task_id)
 	if not task or task.goal.user_id != current_user.id:
@@ -52,14 +61,25 @@ async def update_task_status(task_id: UUID, db: AsyncSession = Depends(get_db),
 	if task.goal.end_date == datetime.today():
 		await update_goal(db=db, db_goal=task.goal, goal_in=GoalUpdate(status=GoalStatus.completed))
 		remove_user_tasks(task.goal.celery_task_ids)
+	await commit(db)
 	return MessageResponse(message="Task marked as done successfully")
 
 
-@router.post("/create", response_model=MessageResponse, dependencies=[Depends(RateLimiter(times=10, seconds=60))])
-async def create_daily_task(db: AsyncSession = Depends(get_db)):
-	users = await get_users_with_active_goal(db)
-	if users:
-		for user in users:
-			await create_daily_task_by_id(db=db, user_id=user.id)
+@router.post("/create", response_model=FanoutJobResponse, status_code=status.HTTP_202_ACCEPTED, dependencies=[Depends(RateLimit("write"))])
+async def create_daily_task(current_user: User = Depends(get_current_admin)):
+	from app.app_tasks.tasks import create_daily_tasks_for_active_goals
+
+	job = create_daily_tasks_for_active_goals.delay()
+	return FanoutJobResponse(job_id=job.id, status="PENDING")
+
+
+@router.get("/create/{job_id}", response_model=FanoutJobResponse, dependencies=[Depends(RateLimit("read"))])
+async def get_daily_task_job(job_id: str, current_user: User = Depends(get_current_admin)):
+	from celery.result import AsyncResult
+	from app.app_tasks.celery import celery
 
-	return MessageResponse(message=f"Daily tasks for {len(users)} users has been created successfully")
\ No newline at end of file
+	job = AsyncResult(job_id, app=celery)
+	if job.failed():
+		return FanoutJobResponse(job_id=job_id, status=job.status, failures={"job": str(job.info)})
+	progress = job.info if isinstance(job.info, dict) else {}
+	return FanoutJobResponse(job_id=job_id, status=job.status, **progress)
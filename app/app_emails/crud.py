@@ -0,0 +1,66 @@
+import json
+from typing import Any, Dict, List
+from uuid import UUID
+
+from sqlalchemy import func, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.common.outbox import Outbox
+from app.app_emails.models import EmailOutbox, EmailStatus
+
+
+def _schedule_drain() -> None:
+	from app.app_emails.tasks import drain_email_outbox
+	drain_email_outbox.delay()
+
+
+email_outbox = Outbox(
+	EmailOutbox,
+	name="email outbox",
+	pending=EmailStatus.pending,
+	done=EmailStatus.sent,
+	failed=EmailStatus.failed,
+	done_at="sent_at",
+	max_attempts=settings.email_max_attempts,
+	retry_base_seconds=settings.email_retry_base_seconds,
+	schedule=_schedule_drain,
+	in_flight=EmailStatus.sending,
+	lease_seconds=settings.email_send_lease_seconds,
+)
+
+
+async def enqueue_email(db: AsyncSession, to_email: str, template: str, context: Dict[str, Any]) -> None:
+	stmt = insert(EmailOutbox).values(
+		to_email=to_email,
+		template=template,
+		context=json.dumps(context, default=str),
+		status=EmailStatus.pending,
+	)
+	await db.execute(
+		stmt.on_conflict_do_update(
+			index_elements=[EmailOutbox.to_email, EmailOutbox.template],
+			index_where=text("status = 'pending'"),
+			set_={
+				"context": stmt.excluded.context,
+				"attempts": 0,
+				"next_attempt_at": func.now(),
+				"last_error": None,
+				"updated_at": func.now(),
+			},
+		)
+	)
+	email_outbox.kick_after_commit(db)
+
+
+async def claim_pending_emails(db: AsyncSession, limit: int) -> List[EmailOutbox]:
+	return await email_outbox.lease(db, limit)
+
+
+async def mark_emails_sent(db: AsyncSession, ids: List[UUID]) -> None:
+	await email_outbox.mark_done(db, ids)
+
+
+async def mark_emails_failed(db: AsyncSession, ids: List[UUID], error: str) -> None:
+	await email_outbox.mark_failed(db, ids, error)
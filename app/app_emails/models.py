@@ -0,0 +1,28 @@
+import enum
+
+from sqlalchemy import Column, String, Text, DateTime, Enum as SQLEnum, Index, text
+
+from app.core.database import Base
+from app.common.mixins import IDMixin, CreatedUpdatedAtMixin, OutboxMixin
+
+
+class EmailStatus(str, enum.Enum):
+	pending = "pending"
+	sending = "sending"
+	sent = "sent"
+	failed = "failed"
+
+class EmailOutbox(Base, IDMixin, CreatedUpdatedAtMixin, OutboxMixin):
+	__tablename__ = "email_outbox"
+
+	to_email = Column(String(255), nullable=False)
+	template = Column(String(64), nullable=False)
+	context = Column(Text, nullable=False)
+	status = Column(SQLEnum(EmailStatus), nullable=False, default=EmailStatus.pending)
+	sent_at = Column(DateTime(timezone=True), nullable=True)
+
+	__table_args__ = (
+		# at most one pending email per recipient and template; newer requests replace its context
+		Index("ux_email_outbox_pending_recipient_template", "to_email", "template", unique=True, postgresql_where=text("status = 'pending'")),
+		Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+	)
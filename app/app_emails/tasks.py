@@ -0,0 +1,66 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from typing import Any, Dict, List
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, commit
+from app.app_tasks import runtime
+from app.app_tasks.celery import celery
+from app.app_emails.crud import claim_pending_emails, mark_emails_failed, mark_emails_sent
+from app.app_emails.templates import render
+from app.lib.resend import send_batch
+
+
+logger = logging.getLogger(__name__)
+
+
+async def _drain() -> Dict[str, Any]:
+	sent = failed = 0
+	while True:
+		# the claim marks the rows in flight and commits, so no lock is held while the provider is called
+		async with AsyncSessionLocal() as db:
+			emails = await claim_pending_emails(db, settings.email_batch_size)
+			await commit(db)
+		if not emails:
+			break
+
+		messages, ready = [], []
+		failures: Dict[str, List[UUID]] = defaultdict(list)
+		for email in emails:
+			try:
+				messages.append({"to": [email.to_email], **render(email.template, json.loads(email.context))})
+				ready.append(email.id)
+			except Exception as e:
+				logger.error(f"Rendering {email.template} email {email.id} failed: {str(e)}")
+				failures[f"render: {str(e)}"].append(email.id)
+
+		delivered = []
+		results = await asyncio.to_thread(send_batch, messages) if messages else []
+		for email_id, error in zip(ready, results):
+			if error is None:
+				delivered.append(email_id)
+			else:
+				failures[error].append(email_id)
+		if len(delivered) < len(ready):
+			logger.error(f"Sending {len(ready) - len(delivered)} of {len(ready)} emails failed")
+
+		# each row records its own outcome, so a failed chunk never resends the ones that went out
+		async with AsyncSessionLocal() as db:
+			await mark_emails_sent(db, delivered)
+			for error, ids in failures.items():
+				await mark_emails_failed(db, ids, error)
+			await commit(db)
+		sent += len(delivered)
+		failed += len(emails) - len(delivered)
+
+		if len(emails) < settings.email_batch_size:
+			break
+	return {"sent": sent, "failed": failed}
+
+
+@celery.task(bind=True)
+def drain_email_outbox(self):
+	return runtime.run(_drain())
@@ -0,0 +1,74 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from string import Template
+from typing import Any, Dict, Tuple
+from urllib.parse import quote_plus
+
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class EmailTemplate:
+	subject: str
+	html: str
+	text: str
+
+
+TEMPLATES: Dict[str, EmailTemplate] = {
+	"password_reset": EmailTemplate(
+		subject="Reset your password",
+		html="""
+<!doctype html>
+<html>
+  <body>
+    <p>Hi,</p>
+    <p>You (or someone using this email) requested a password reset for your account.
+       Click the button below to reset your password. This link will expire soon.</p>
+
+    <p style="text-align:center; margin: 24px 0;">
+      <a href="$reset_url" target="_blank" rel="noopener noreferrer"
+         style="display:inline-block; padding:14px 22px; border-radius:8px; text-decoration:none;
+                font-weight:600; font-size:16px; background-color:#0b74ff; color:#ffffff;">
+        Reset your password
+      </a>
+    </p>
+
+    <p>If the button doesn't work, copy and paste this URL into your browser:</p>
+    <p><a href="$reset_url" target="_blank" rel="noopener noreferrer">$reset_url</a></p>
+
+    <hr>
+    <p style="font-size:12px; color:#666">If you did not request a password reset, you can safely ignore this email.</p>
+  </body>
+</html>
+""",
+		text="""
+Hi,
+
+You requested a password reset for your account.
+Open this link to reset your password (expires soon):
+
+$reset_url
+
+If you did not request this, ignore this email.
+""",
+	),
+}
+
+
+def password_reset_url(token: str) -> str:
+	return f"{settings.frontend_url.rstrip('/')}/{settings.frontend_password_reset_path}?token={quote_plus(token)}"
+
+
+@lru_cache(maxsize=None)
+def _compiled(name: str) -> Tuple[Template, Template, Template]:
+	template = TEMPLATES[name]
+	return Template(template.subject), Template(template.html), Template(template.text)
+
+
+def render(name: str, context: Dict[str, Any]) -> Dict[str, str]:
+	subject, html, text = _compiled(name)
+	return {
+		"subject": subject.substitute(context),
+		"html": html.substitute(context),
+		"text": text.substitute(context),
+	}
@@ -1,10 +1,12 @@
-from datetime import timedelta
+from datetime import date, timedelta
 from typing import Optional, List
+from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import Date, String, cast, func, literal, select, update
+from sqlalchemy.dialects.postgresql import insert
 
-from app.app_goals.models import Goal, GoalStatus
+from app.app_goals.models import Goal, GoalDailyStats, GoalStatus
 from app.app_goals.schemas import GoalRequest, GoalUpdate
 
 
@@ -14,20 +16,20 @@ def _calculate_end_date(start_date, target_days):
 
 async def create_new_goal(db: AsyncSession, user_id: str, goal_in: GoalRequest) -> Goal:
 	end_date = _calculate_end_date(goal_in.start_date, goal_in.target_days)
-	goal = Goal(
-		user_id=user_id,
-		title=goal_in.title,
-		description=goal_in.description,
-		target_days=goal_in.target_days,
-		start_date=goal_in.start_date,
-		end_date=end_date,
-		status=GoalStatus.active,
+	res = await db.execute(
+		insert(Goal)
+		.values(
+			user_id=user_id,
+			title=goal_in.title,
+			description=goal_in.description,
+			target_days=goal_in.target_days,
+			start_date=goal_in.start_date,
+			end_date=end_date,
+			status=GoalStatus.active,
+		)
+		.returning(Goal)
 	)
-	
-	db.add(goal)
-	await db.commit()
-	await db.refresh(goal)
-	return goal
+	return res.scalar_one()
 
 
 async def get_active_goal(db: AsyncSession, user_id: str) -> Optional[Goal]:
@@ -35,6 +37,25 @@ async def get_active_goal(db: AsyncSession, user_id: str) -> Optional[Goal]:
 	return res.scalars().first()
 
 
+async def get_active_goals(db: AsyncSession, user_ids: List[UUID]) -> List[Goal]:
+	res = await db.execute(select(Goal).where(Goal.user_id.in_(user_ids), Goal.status == GoalStatus.active))
+	return res.scalars().all()
+
+
+async def get_active_goals_by_ids(db: AsyncSession, goal_ids: List[UUID]) -> List[Goal]:
+	res = await db.execute(select(Goal).where(Goal.id.in_(goal_ids), Goal.status == GoalStatus.active))
+	return res.scalars().all()
+
+
+def shard_clause(shard: int, shards: int):
+	return func.hashtext(cast(Goal.id, String)).op("&")(0x7FFFFFFF) % shards == shard
+
+
+def cadence_clauses(cadence_days: int, today: Optional[date] = None):
+	age = literal(today or date.today(), Date) - Goal.start_date
+	return [age > 0, age % cadence_days == 0]
+
+
 async def get_goals(db: AsyncSession, user_id: str, include_deleted: bool = False) -> List[Goal]:
 	goals = select(Goal).where(Goal.user_id == user_id)
 	if not include_deleted:
@@ -50,23 +71,46 @@ async def get_goal(db: AsyncSession, goal_id: str) -> Optional[Goal]:
 	return res.scalars().first()
 
 
+async def bump_goal_version(db: AsyncSession, goal_id) -> None:
+	await db.execute(update(Goal).where(Goal.id == goal_id).values(version=Goal.version + 1))
+
+
+async def record_task_stats(db: AsyncSession, goal_id: UUID, day: date, assigned: int = 0, done: int = 0, missed: int = 0) -> None:
+	await record_task_stats_many(db, [{"goal_id": goal_id, "day": day, "assigned": assigned, "done": done, "missed": missed}])
+
+
+async def record_task_stats_many(db: AsyncSession, rows: List[dict]) -> None:
+	if not rows:
+		return
+	stmt = insert(GoalDailyStats).values([
+		{"assigned": 0, "done": 0, "missed": 0, **row} for row in rows
+	])
+	stmt = stmt.on_conflict_do_update(
+		index_elements=[GoalDailyStats.goal_id, GoalDailyStats.day],
+		set_={
+			"assigned": GoalDailyStats.assigned + stmt.excluded.assigned,
+			"done": GoalDailyStats.done + stmt.excluded.done,
+			"missed": GoalDailyStats.missed + stmt.excluded.missed,
+		},
+	)
+	await db.execute(stmt)
+
+
+async def get_goal_daily_stats(db: AsyncSession, goal_id: UUID) -> List[GoalDailyStats]:
+	res = await db.execute(select(GoalDailyStats).where(GoalDailyStats.goal_id == goal_id).order_by(GoalDailyStats.day))
+	return res.scalars().all()
+
+
 async def update_goal(db: AsyncSession, db_goal: Goal, goal_in: GoalUpdate) -> Optional[Goal]:
 	goal_data = goal_in.model_dump(exclude_unset=True)
 
 	if goal_data:
-		for field, value in goal_data.items():
-			setattr(db_goal, field, value)
-
-		db.add(db_goal)
-		await db.commit()
-		await db.refresh(db_goal)
+		res = await db.execute(update(Goal).where(Goal.id == db_goal.id).values(**goal_data).returning(Goal))
+		db_goal = res.scalar_one()
 
 	return db_goal
 
 
 async def soft_delete_goal(db: AsyncSession, db_goal: Goal) -> Goal:
-	db_goal.status = GoalStatus.deleted
-	db.add(db_goal)
-	await db.commit()
-	await db.refresh(db_goal)
-	return db_goal
+	res = await db.execute(update(Goal).where(Goal.id == db_goal.id).values(status=GoalStatus.deleted).returning(Goal))
+	return res.scalar_one()
@@ -24,8 +24,19 @@ class Goal(Base, IDMixin):
 	status = Column(SQLEnum(GoalStatus), nullable=False, default=GoalStatus.active)
 	target_days = Column(Integer, nullable=False)
 	celery_task_ids = Column(Text, nullable=True)
+	version = Column(Integer, nullable=False, default=0, server_default="0")
 
-	user = relationship("User", back_populates="goals", lazy="selectin")
-	tasks = relationship("Task", back_populates="goal", cascade="all, delete-orphan", lazy="selectin")
-	weekly_reports = relationship("WeeklyReport", back_populates="goal", cascade="all, delete-orphan", lazy="selectin")
-	monthly_reports = relationship("MonthlyReport", back_populates="goal", cascade="all, delete-orphan", lazy="selectin")
+	user = relationship("User", back_populates="goals", lazy="raise")
+	tasks = relationship("Task", back_populates="goal", cascade="all, delete-orphan", passive_deletes=True, lazy="raise")
+	weekly_reports = relationship("WeeklyReport", back_populates="goal", cascade="all, delete-orphan", passive_deletes=True, lazy="raise")
+	monthly_reports = relationship("MonthlyReport", back_populates="goal", cascade="all, delete-orphan", passive_deletes=True, lazy="raise")
+
+
+class GoalDailyStats(Base):
+	__tablename__ = "goal_daily_stats"
+
+	goal_id = Column(UUID(as_uuid=True), ForeignKey("goals.id", ondelete="CASCADE"), primary_key=True)
+	day = Column(Date, primary_key=True)
+	assigned = Column(Integer, nullable=False, default=0, server_default="0")
+	done = Column(Integer, nullable=False, default=0, server_default="0")
+	missed = Column(Integer, nullable=False, default=0, server_default="0")
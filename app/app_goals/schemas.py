@@ -1,6 +1,6 @@
 import enum
 from datetime import date
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 
 from pydantic import BaseModel, Field
@@ -29,3 +29,18 @@ class GoalResponse(BaseModel):
 	end_date: date
 	status: GoalStatus
 	target_days: int
+
+
+class GoalDayStatsResponse(BaseModel):
+	day: date
+	assigned: int
+	done: int
+	missed: int
+
+
+class GoalProgressResponse(BaseModel):
+	goal_id: UUID
+	assigned: int
+	done: int
+	missed: int
+	days: List[GoalDayStatsResponse]
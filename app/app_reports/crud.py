@@ -1,48 +1,60 @@
+from typing import List, Optional, Tuple
 from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from sqlalchemy import insert, select, desc
 
+from app.common.pagination import PageParams, paginate
+from app.app_goals.crud import bump_goal_version
 from app.app_reports.models import WeeklyReport, MonthlyReport
 from app.app_reports.schemas import WeeklyReportRequest, MonthlyReportRequest
 
 
 async def create_weekly_report(db: AsyncSession, data: WeeklyReportRequest) -> WeeklyReport:
-	report = WeeklyReport(
-		goal_id=data.goal_id,
-		week_start=data.week_start,
-		week_end=data.week_end,
-		completed_tasks=data.completed_tasks,
-		missed_tasks=data.missed_tasks,
-		ai_suggestion=data.ai_suggestion,
+	res = await db.execute(
+		insert(WeeklyReport)
+		.values(
+			goal_id=data.goal_id,
+			week_start=data.week_start,
+			week_end=data.week_end,
+			completed_tasks=data.completed_tasks,
+			missed_tasks=data.missed_tasks,
+			ai_suggestion=data.ai_suggestion,
+		)
+		.returning(WeeklyReport)
 	)
-	db.add(report)
-	await db.commit()
-	await db.refresh(report)
-	return report
+	await bump_goal_version(db, data.goal_id)
+	return res.scalar_one()
 
 
-async def list_weekly_reports(db: AsyncSession, goal_id: UUID) -> list[WeeklyReport]:
-    res = await db.execute(select(WeeklyReport).where(WeeklyReport.goal_id == goal_id))
-    return res.scalars().all()
-
+async def list_weekly_reports(db: AsyncSession, goal_id: UUID, page: PageParams) -> Tuple[List[WeeklyReport], Optional[str]]:
+	return await paginate(
+		db, select(WeeklyReport).where(WeeklyReport.goal_id == goal_id), (WeeklyReport.week_start, WeeklyReport.id), page
+	)
 
-async def create_monthly_report(db: AsyncSession, data: MonthlyReportRequest
 
-) -> MonthlyReport:
-	report = MonthlyReport(
-		goal_id=data.goal_id,
-		month=data.month,
-		year=data.year,
-		summary=data.summary,
-		performance_score=data.performance_score,
+async def create_monthly_report(db: AsyncSession, data: MonthlyReportRequest) -> MonthlyReport:
+	res = await db.execute(
+		insert(MonthlyReport)
+		.values(
+			goal_id=data.goal_id,
+			month=data.month,
+			year=data.year,
+			completed_tasks=data.completed_tasks,
+			missed_tasks=data.missed_tasks,
+			summary=data.summary,
+			performance_score=data.performance_score,
+		)
+		.returning(MonthlyReport)
 	)
-	db.add(report)
-	await db.commit()
-	await db.refresh(report)
-	return report
+	await bump_goal_version(db, data.goal_id)
+	return res.scalar_one()
 
 
-async def list_monthly_reports(db: AsyncSession, goal_id: UUID) -> list[MonthlyReport]:
-    res = await db.execute(select(MonthlyReport).where(MonthlyReport.goal_id == goal_id))
-    return res.scalars().all()
\ No newline at end of file
+async def list_monthly_reports(db: AsyncSession, goal_id: UUID, page: PageParams) -> Tuple[List[MonthlyReport], Optional[str]]:
+	return await paginate(
+		db,
+		select(MonthlyReport).where(MonthlyReport.goal_id == goal_id),
+		(MonthlyReport.year, MonthlyReport.month, MonthlyReport.id),
+		page,
+	)
\ No newline at end of file
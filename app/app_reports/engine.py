@@ -0,0 +1,121 @@
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.app_goals.models import GoalDailyStats
+from app.app_reports.schemas import MonthlyReportRequest, WeeklyReportRequest
+
+
+WEEK_DAYS = 7
+MONTH_DAYS = 30
+
+# performance_score weighs the completion rate of the last RECENT_DAYS against the rest of the window
+RECENT_DAYS = 7
+RECENT_WEIGHT = 0.4
+PRIOR_WEIGHT = 0.6
+
+
+def _rate(done: int, missed: int) -> Optional[float]:
+	resolved = done + missed
+	return done / resolved if resolved else None
+
+
+@dataclass
+class ReportStats:
+	goal_id: UUID
+	start: date
+	end: date
+	assigned: int = 0
+	done: int = 0
+	missed: int = 0
+	recent_done: int = 0
+	recent_missed: int = 0
+
+	@property
+	def performance_score(self) -> Optional[float]:
+		recent = _rate(self.recent_done, self.recent_missed)
+		prior = _rate(self.done - self.recent_done, self.missed - self.recent_missed)
+		if recent is None and prior is None:
+			return None
+		if recent is None:
+			score = prior
+		elif prior is None:
+			score = recent
+		else:
+			score = RECENT_WEIGHT * recent + PRIOR_WEIGHT * prior
+		return round(score * 100, 2)
+
+	def as_dict(self) -> Dict[str, Any]:
+		return {
+			"start": self.start.isoformat(),
+			"end": self.end.isoformat(),
+			"assigned": self.assigned,
+			"done": self.done,
+			"missed": self.missed,
+			"performance_score": self.performance_score,
+		}
+
+
+async def report_stats(db: AsyncSession, goal_ids: List[UUID], days: int, today: Optional[date] = None) -> Dict[UUID, ReportStats]:
+	end = today or date.today()
+	# inclusive on both ends, so a 7 day report runs from end - 6 to end
+	start = end - timedelta(days=days - 1)
+	recent = GoalDailyStats.day > end - timedelta(days=RECENT_DAYS)
+
+	stats = {goal_id: ReportStats(goal_id=goal_id, start=start, end=end) for goal_id in goal_ids}
+	if not goal_ids:
+		return stats
+
+	res = await db.execute(
+		select(
+			GoalDailyStats.goal_id,
+			func.sum(GoalDailyStats.assigned).label("assigned"),
+			func.sum(GoalDailyStats.done).label("done"),
+			func.sum(GoalDailyStats.missed).label("missed"),
+			func.coalesce(func.sum(GoalDailyStats.done).filter(recent), 0).label("recent_done"),
+			func.coalesce(func.sum(GoalDailyStats.missed).filter(recent), 0).label("recent_missed"),
+		)
+		.where(GoalDailyStats.goal_id.in_(goal_ids), GoalDailyStats.day >= start, GoalDailyStats.day <= end)
+		.group_by(GoalDailyStats.goal_id)
+	)
+	for row in res.all():
+		stats[row.goal_id] = ReportStats(
+			goal_id=row.goal_id,
+			start=start,
+			end=end,
+			assigned=row.assigned,
+			done=row.done,
+			missed=row.missed,
+			recent_done=row.recent_done,
+			recent_missed=row.recent_missed,
+		)
+	return stats
+
+
+def weekly_report_request(stats: ReportStats, ai_suggestion: Optional[str] = None) -> WeeklyReportRequest:
+	return WeeklyReportRequest(
+		goal_id=stats.goal_id,
+		week_start=stats.start,
+		week_end=stats.end,
+		completed_tasks=stats.done,
+		missed_tasks=stats.missed,
+		ai_suggestion=ai_suggestion,
+	)
+
+
+def monthly_report_request(stats: ReportStats, summary: Optional[str] = None) -> MonthlyReportRequest:
+	# the 30 day window rarely lines up with a calendar month, so report on the month it mostly covers
+	middle = stats.start + (stats.end - stats.start) / 2
+	return MonthlyReportRequest(
+		goal_id=stats.goal_id,
+		month=middle.month,
+		year=middle.year,
+		completed_tasks=stats.done,
+		missed_tasks=stats.missed,
+		summary=summary,
+		performance_score=stats.performance_score,
+	)
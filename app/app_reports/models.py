@@ -1,6 +1,6 @@
 from uuid import UUID
 
-from sqlalchemy import Column, Integer, Date, Text, Numeric, ForeignKey
+from sqlalchemy import Column, Integer, Date, Text, Numeric, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 
@@ -18,7 +18,11 @@ class WeeklyReport(Base, IDMixin, CreatedUpdatedAtMixin):
 	missed_tasks = Column(Integer, nullable=False, default=0)
 	ai_suggestion = Column(Text, nullable=True)
 
-	goal = relationship("Goal", back_populates="weekly_reports", lazy="selectin")
+	goal = relationship("Goal", back_populates="weekly_reports", lazy="raise")
+
+	__table_args__ = (
+		Index("ix_weekly_reports_goal_id_week_start_id", "goal_id", "week_start", "id"),
+	)
 
 
 class MonthlyReport(Base, IDMixin, CreatedUpdatedAtMixin):
@@ -32,4 +36,8 @@ class MonthlyReport(Base, IDMixin, CreatedUpdatedAtMixin):
 	summary = Column(Text, nullable=True)
 	performance_score = Column(Numeric(5, 2), nullable=True)
 
-	goal = relationship("Goal", back_populates="monthly_reports", lazy="selectin")
+	goal = relationship("Goal", back_populates="monthly_reports", lazy="raise")
+
+	__table_args__ = (
+		Index("ix_monthly_reports_goal_id_year_month_id", "goal_id", "year", "month", "id"),
+	)
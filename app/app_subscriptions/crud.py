@@ -1,15 +1,19 @@
 
 import json
 import logging
-from datetime import datetime, timezone
-from typing import Optional
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import exists, func, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
 from app.core.config import settings
-from app.app_subscriptions.models import StripeSubscription, SubscriptionStatus
+from app.common.outbox import Outbox
+from app.core.principal import invalidate_principal_on_commit
+from app.app_subscriptions.models import StripeEvent, StripeEventStatus, StripeSubscription, SubscriptionStatus
 from app.app_subscriptions.schemas import SubscriptionRequest, SubscriptionUpdate
 from app.app_users.models import User
 
@@ -43,11 +47,10 @@ async def get_subscription_by_stripe_id(db: AsyncSession, stripe_subscription_id
 
 
 async def create_subscription(db: AsyncSession, subscription_in: SubscriptionRequest) -> StripeSubscription:
-    subscription = StripeSubscription(**subscription_in.model_dump())
-    db.add(subscription)
-    await db.commit()
-    await db.refresh(subscription)
-    return subscription
+    res = await db.execute(
+        insert(StripeSubscription).values(**subscription_in.model_dump()).returning(StripeSubscription)
+    )
+    return res.scalar_one()
 
 
 async def update_subscription(
@@ -55,15 +58,21 @@ async def update_subscription(
     db_subscription: StripeSubscription, 
     subscription_in: SubscriptionUpdate
 ) -> StripeSubscription:
-    update_dict = subscription_in.model_dump(exclude_unset=True)
-    for key, value in update_dict.items():
-        if value is not None or key in ['stripe_subscription_id', 'status']:
-            setattr(db_subscription, key, value)
-    
-    db.add(db_subscription)
-    await db.commit()
-    await db.refresh(db_subscription)
-    return db_subscription
+    update_dict = {
+        key: value
+        for key, value in subscription_in.model_dump(exclude_unset=True).items()
+        if value is not None or key in ['stripe_subscription_id', 'status']
+    }
+    if not update_dict:
+        return db_subscription
+
+    res = await db.execute(
+        update(StripeSubscription)
+        .where(StripeSubscription.id == db_subscription.id)
+        .values(**update_dict)
+        .returning(StripeSubscription)
+    )
+    return res.scalar_one()
 
 
 async def upsert_subscription_from_stripe(
@@ -122,19 +131,20 @@ async def upsert_subscription_from_stripe(
         logger.info(f"Created subscription {stripe_subscription_id} for user {user_id}")
     
     subscription_in = SubscriptionUpdate(
-        stripe_subscription_id,
-        plan_id,
-        status,
-        current_period_end,
-        current_period_start,
-        canceled_at,
-        cancel_at_period_end,
-        price,
-        subscription_metadata,
-        trial_start,
-        trial_end,
+        stripe_subscription_id=stripe_subscription_id,
+        plan_id=plan_id,
+        status=status,
+        current_period_end=current_period_end,
+        current_period_start=current_period_start,
+        canceled_at=canceled_at,
+        cancel_at_period_end=cancel_at_period_end,
+        price=price,
+        subscription_metadata=subscription_metadata,
+        trial_start=trial_start,
+        trial_end=trial_end,
     )
     db_subscription = await update_subscription(db, db_subscription, subscription_in)
+    await invalidate_principal_on_commit(db, db_subscription.user_id)
     logger.info(f"Updated subscription {stripe_subscription_id} for user {user_id}")
     
     return db_subscription
@@ -152,3 +162,87 @@ async def is_subscription_active(db_subscription: Optional[StripeSubscription])
         return db_subscription.current_period_end > datetime.now(timezone.utc)
     
     return True
+
+
+# the events that can change a subscription; anything else Stripe sends is stored but never applied
+HANDLED_EVENT_TYPES = frozenset({
+    "checkout.session.completed",
+    "customer.subscription.created",
+    "customer.subscription.updated",
+    "customer.subscription.deleted",
+    "invoice.paid",
+    "invoice.payment_succeeded",
+    "invoice.payment_failed",
+})
+
+
+def _event_subscription_id(event) -> Optional[str]:
+    data = event.data.object
+    if event.type.startswith("customer.subscription."):
+        return data.get("id")
+    return data.get("subscription")
+
+
+def _schedule_processing() -> None:
+    from app.app_subscriptions.tasks import process_stripe_events
+    process_stripe_events.apply_async(countdown=settings.stripe_event_coalesce_seconds + 1)
+
+
+stripe_event_outbox = Outbox(
+    StripeEvent,
+    name="Stripe event",
+    pending=StripeEventStatus.pending,
+    done=StripeEventStatus.processed,
+    failed=StripeEventStatus.failed,
+    done_at="processed_at",
+    max_attempts=settings.stripe_event_max_attempts,
+    retry_base_seconds=settings.stripe_event_retry_base_seconds,
+    schedule=_schedule_processing,
+)
+
+
+async def record_stripe_event(db: AsyncSession, event, payload: str) -> bool:
+    handled = event.type in HANDLED_EVENT_TYPES
+    res = await db.execute(
+        pg_insert(StripeEvent)
+        .values(
+            stripe_event_id=event.id,
+            type=event.type,
+            stripe_subscription_id=_event_subscription_id(event) if handled else None,
+            stripe_created_at=_convert_timestamp(event.created) or datetime.now(timezone.utc),
+            payload=payload,
+            status=StripeEventStatus.pending if handled else StripeEventStatus.processed,
+            processed_at=None if handled else func.now(),
+        )
+        .on_conflict_do_nothing(index_elements=[StripeEvent.stripe_event_id])
+        .returning(StripeEvent.id)
+    )
+    recorded = res.scalar_one_or_none() is not None
+    if recorded and handled:
+        stripe_event_outbox.kick_after_commit(db)
+    return recorded
+
+
+async def claim_stripe_events(db: AsyncSession, limit: int) -> List[StripeEvent]:
+    # a subscription's events become due together once no new event arrived for it within the
+    # coalescing window, so a checkout burst is applied with a single fetch and upsert
+    recent = aliased(StripeEvent)
+    quiet_since = func.now() - timedelta(seconds=settings.stripe_event_coalesce_seconds)
+    return await stripe_event_outbox.claim(
+        db,
+        limit,
+        ~exists().where(
+            recent.stripe_subscription_id == StripeEvent.stripe_subscription_id,
+            recent.status == StripeEventStatus.pending,
+            recent.created_at > quiet_since,
+        ),
+        order_by=(StripeEvent.stripe_created_at, StripeEvent.created_at),
+    )
+
+
+async def mark_stripe_events_processed(db: AsyncSession, ids: List[UUID]) -> None:
+    await stripe_event_outbox.mark_done(db, ids)
+
+
+async def mark_stripe_events_failed(db: AsyncSession, ids: List[UUID], error: str) -> None:
+    await stripe_event_outbox.mark_failed(db, ids, error)
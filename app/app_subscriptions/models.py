@@ -1,11 +1,11 @@
 import enum
 
-from sqlalchemy import Column, String, Boolean, ForeignKey, DateTime, Numeric, Text, Enum as SQLEnum
+from sqlalchemy import Column, String, Boolean, ForeignKey, DateTime, Numeric, Text, Enum as SQLEnum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 
 from app.core.database import Base
-from app.common.mixins import IDMixin, CreatedUpdatedAtMixin
+from app.common.mixins import IDMixin, CreatedUpdatedAtMixin, OutboxMixin
 
 
 class SubscriptionStatus(str, enum.Enum):
@@ -18,6 +18,11 @@ class SubscriptionStatus(str, enum.Enum):
     canceled = "canceled"
     unpaid = "unpaid"
 
+class StripeEventStatus(str, enum.Enum):
+    pending = "pending"
+    processed = "processed"
+    failed = "failed"
+
 class StripeSubscription(Base, IDMixin, CreatedUpdatedAtMixin):
     __tablename__ = "stripe_subscriptions"
 
@@ -35,4 +40,21 @@ class StripeSubscription(Base, IDMixin, CreatedUpdatedAtMixin):
     trial_start = Column(DateTime(timezone=True), nullable=True)
     trial_end = Column(DateTime(timezone=True), nullable=True)
 
-    user = relationship("User", back_populates="subscriptions", lazy="selectin")
\ No newline at end of file
+    user = relationship("User", back_populates="subscriptions", lazy="raise")
+
+
+class StripeEvent(Base, IDMixin, CreatedUpdatedAtMixin, OutboxMixin):
+    __tablename__ = "stripe_events"
+
+    stripe_event_id = Column(String(255), nullable=False, unique=True)
+    type = Column(String(255), nullable=False)
+    stripe_subscription_id = Column(String(255), nullable=True)
+    stripe_created_at = Column(DateTime(timezone=True), nullable=False)
+    payload = Column(Text, nullable=False)
+    status = Column(SQLEnum(StripeEventStatus), nullable=False, default=StripeEventStatus.pending)
+    processed_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_stripe_events_status_next_attempt_at", "status", "next_attempt_at"),
+        Index("ix_stripe_events_subscription_created", "stripe_subscription_id", "stripe_created_at"),
+    )
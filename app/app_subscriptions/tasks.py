@@ -0,0 +1,89 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, commit
+from app.app_tasks import runtime
+from app.app_tasks.celery import celery
+from app.lib.stripe_client import get_stripe
+from app.app_subscriptions.crud import (
+    claim_stripe_events,
+    mark_stripe_events_failed,
+    mark_stripe_events_processed,
+    upsert_subscription_from_stripe,
+)
+from app.app_subscriptions.models import StripeEvent
+
+
+logger = logging.getLogger(__name__)
+
+def _extract_user_id(*objects) -> Optional[str]:
+    for obj in objects:
+        if not obj:
+            continue
+        metadata = obj.get("metadata", {})
+        if metadata and metadata.get("user_id"):
+            try:
+                return metadata["user_id"]
+            except (ValueError, TypeError):
+                continue
+    return None
+
+
+async def _retrieve_subscription(sub_id: str):
+    stripe = get_stripe()
+    return await asyncio.to_thread(stripe.Subscription.retrieve, sub_id, expand=["items.data.price"])
+
+
+async def _apply_subscription_events(db, stripe_subscription_id: str, events: List[StripeEvent]) -> None:
+    # whatever the burst held, the subscription as Stripe has it now is the state to store
+    stripe = get_stripe()
+    objects = [stripe.Event.construct_from(json.loads(stored.payload), stripe.api_key).data.object for stored in events]
+    stripe_sub = await _retrieve_subscription(stripe_subscription_id)
+    await upsert_subscription_from_stripe(db, stripe_sub, user_id=_extract_user_id(stripe_sub, *objects))
+    logger.info(f"Applied {len(events)} Stripe events to subscription {stripe_subscription_id}")
+
+
+async def _drain() -> Dict[str, Any]:
+    processed = failed = 0
+    while True:
+        async with AsyncSessionLocal() as db:
+            events = await claim_stripe_events(db, settings.stripe_event_batch_size)
+            if not events:
+                break
+
+            groups: Dict[str, List[StripeEvent]] = defaultdict(list)
+            unrelated = []
+            for stored in events:
+                if stored.stripe_subscription_id:
+                    groups[stored.stripe_subscription_id].append(stored)
+                else:
+                    unrelated.append(stored.id)
+            if unrelated:
+                logger.info(f"Skipping {len(unrelated)} Stripe events without a subscription")
+                await mark_stripe_events_processed(db, unrelated)
+
+            for stripe_subscription_id, group in groups.items():
+                ids = [stored.id for stored in group]
+                try:
+                    async with db.begin_nested():
+                        await _apply_subscription_events(db, stripe_subscription_id, group)
+                    await mark_stripe_events_processed(db, ids)
+                    processed += len(ids)
+                except Exception as e:
+                    logger.error(f"Error processing {len(ids)} Stripe events for subscription {stripe_subscription_id}: {str(e)}")
+                    await mark_stripe_events_failed(db, ids, str(e))
+                    failed += len(ids)
+
+            await commit(db)
+            if len(events) < settings.stripe_event_batch_size:
+                break
+    return {"processed": processed, "failed": failed}
+
+
+@celery.task(bind=True)
+def process_stripe_events(self):
+    return runtime.run(_drain())
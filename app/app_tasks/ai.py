@@ -1,69 +1,162 @@
 import asyncio
 import json
-from datetime import datetime, timedelta
+import logging
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional
+from uuid import UUID
 
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
-from google import genai
-from google.genai.errors import ServerError, APIError
+from sqlalchemy import select, desc, func
 
 from app.core.config import settings
-from app.core.database import get_db
-from app.app_tasks.utils import create_monthly_report_prompt, create_next_task_prompt, create_weekly_report_prompt
+from app.lib import gemini
+from app.app_reports.engine import MONTH_DAYS, WEEK_DAYS, ReportStats
+from app.app_tasks.utils import HISTORY_WINDOW, create_monthly_report_prompt, create_next_task_prompt, create_next_tasks_batch_prompt, create_weekly_report_prompt
 from app.app_tasks.models import Task
+from app.app_tasks.schemas import GeneratedTask
 
-client = genai.Client(api_key=settings.gemini_api_key)
 
-async def generate_next_task(db: AsyncSession, goal):
-	tasks_raw = await db.execute(select(Task).where(Task.goal_id == goal.id))
-	tasks = tasks_raw.scalars().all()
+logger = logging.getLogger(__name__)
+
+
+HISTORY_COLUMNS = (Task.goal_id, Task.title, Task.description, Task.assigned_date, Task.status, Task.difficulty)
+
+
+async def _recent_history(db: AsyncSession, goal_ids: List[UUID], limit: int = HISTORY_WINDOW, since: Optional[date] = None) -> Dict[UUID, List[Any]]:
+	ranked = select(
+		*HISTORY_COLUMNS,
+		func.row_number().over(partition_by=Task.goal_id, order_by=desc(Task.assigned_date)).label("recency"),
+	).where(Task.goal_id.in_(goal_ids))
+	if since is not None:
+		ranked = ranked.where(Task.assigned_date >= since)
+	ranked = ranked.subquery()
+	res = await db.execute(
+		select(ranked).where(ranked.c.recency <= limit).order_by(ranked.c.goal_id, ranked.c.assigned_date)
+	)
+	history = defaultdict(list)
+	for row in res.all():
+		history[row.goal_id].append(row)
+	return history
+
+
+def _log_prompt_size(kind: str, prompts: Dict[str, Any]) -> None:
+	logger.debug(f"{kind} prompt: ~{prompts['estimated_tokens']} input tokens")
+
+
+async def _generate_single(goal, tasks) -> Dict[str, Any]:
 	prompts = create_next_task_prompt(goal, tasks)
+	_log_prompt_size("next_task", prompts)
+	data = await gemini.generate_json(prompts["system"], prompts["user"])
+	return GeneratedTask.model_validate(data).model_dump()
+
+
+async def generate_next_task(db: AsyncSession, goal) -> Dict[str, Any]:
+	history = await _recent_history(db, [goal.id])
+	return await _generate_single(goal, history[goal.id])
+
+
+def _model_batches(goals: List[Any]) -> List[List[Any]]:
+	# a generated task (title <= 100 chars, description <= 2000) is worth up to ai_output_tokens_per_task
+	size = max(1, settings.ai_max_output_tokens // settings.ai_output_tokens_per_task)
+	return [goals[start:start + size] for start in range(0, len(goals), size)]
+
 
-	max_retries = 3
-	retry_delay = 2
-	
-	for attempt in range(max_retries):
+async def _generate_batch(goals: List[Any], tasks_by_goal: Dict[UUID, List[Any]]) -> Dict[UUID, Dict[str, Any]]:
+	prompts = create_next_tasks_batch_prompt([(goal, tasks_by_goal[goal.id]) for goal in goals])
+	_log_prompt_size(f"next_tasks_batch[{len(goals)}]", prompts)
+	try:
+		data = await gemini.generate_json(prompts["system"], prompts["user"])
+		entries = data.get("tasks") if isinstance(data, dict) else data
+	except gemini.GeminiTruncatedError as e:
+		if len(goals) == 1:
+			logger.error(f"Task generation for goal {goals[0].id} was truncated: {str(e)}")
+			return {}
+		# halve the batch rather than falling back to one call per goal
+		logger.info(f"Batched task generation truncated for {len(goals)} goals, splitting")
+		middle = len(goals) // 2
+		halves = await asyncio.gather(_generate_batch(goals[:middle], tasks_by_goal), _generate_batch(goals[middle:], tasks_by_goal))
+		return {**halves[0], **halves[1]}
+	except (gemini.GeminiError, asyncio.TimeoutError, json.JSONDecodeError) as e:
+		logger.error(f"Batched task generation failed for {len(goals)} goals: {str(e)}")
+		return {}
+
+	results: Dict[UUID, Dict[str, Any]] = {}
+	goals_by_id = {str(goal.id): goal for goal in goals}
+	for entry in entries if isinstance(entries, list) else []:
+		if not isinstance(entry, dict):
+			continue
+		goal = goals_by_id.get(str(entry.get("goal_id")))
+		if not goal or goal.id in results or entry.get("error"):
+			continue
 		try:
-			resp = client.models.generate_content(
-				model=settings.ai_model,
-				contents=[{"role": "user", "parts": [{"text": f"{prompts['system']}\n\nUser: {prompts['user']}"}]}]
-			)
-			return json.loads(resp.text)
-		except ServerError as e:
-			if attempt < max_retries - 1:
-				await asyncio.sleep(retry_delay * (attempt + 1))
+			results[goal.id] = GeneratedTask.model_validate(entry).model_dump()
+		except ValidationError:
+			continue
+	return results
+
+
+async def generate_next_tasks_batch(db: AsyncSession, goals: List[Any]) -> Dict[UUID, Dict[str, Any]]:
+	if not goals:
+		return {}
+
+	tasks_by_goal = await _recent_history(db, [goal.id for goal in goals])
+
+	results: Dict[UUID, Dict[str, Any]] = {}
+	for batch_results in await asyncio.gather(*(_generate_batch(batch, tasks_by_goal) for batch in _model_batches(goals))):
+		results.update(batch_results)
+
+	missing = [goal for goal in goals if goal.id not in results]
+	if missing:
+		logger.info(f"Falling back to single-goal generation for {len(missing)} of {len(goals)} goals")
+		fallbacks = await asyncio.gather(
+			*(_generate_single(goal, tasks_by_goal[goal.id]) for goal in missing),
+			return_exceptions=True,
+		)
+		for goal, fallback in zip(missing, fallbacks):
+			if isinstance(fallback, Exception):
+				logger.error(f"Task generation failed for goal {goal.id}: {str(fallback)}")
 				continue
-			else:
-				raise
-		except (APIError, json.JSONDecodeError) as e:
-			raise
-
-
-async def generate_week_report(goal, db: AsyncSession = get_db()):
-	now = datetime.now()
-	tasks = db.execute(select(Task).where(and_(
-        Task.date >= now - timedelta(days=7),
-        Task.date <= now
-    )))
-
-	prompts = create_weekly_report_prompt(goal, tasks)
-	resp = client.models.generate_content(
-		model=settings.ai_model,
-		contents=[{"role": "user", "parts": [{"text": f"{prompts['system']}\n\nUser: {prompts['user']}"}]}]
-	)
-	return json.loads(resp.text)
+			results[goal.id] = fallback
 
+	return results
 
-async def generate_month_report(goal, db: AsyncSession = get_db()):
-	now = datetime.now()
-	tasks = db.execute(select(Task).where(and_(
-        Task.date >= now - timedelta(days=30),
-        Task.date <= now
-    )))
 
-	prompts = create_monthly_report_prompt(goal, tasks)
-	resp = client.models.generate_content(
-		model=settings.ai_model,
-		contents=[{"role": "user", "parts": [{"text": f"{prompts['system']}\n\nUser: {prompts['user']}"}]}]
-	)
-	return json.loads(resp.text)
\ No newline at end of file
+async def _generate_report_text(kind: str, goal, prompts: Dict[str, Any], field: str) -> Optional[str]:
+	_log_prompt_size(kind, prompts)
+	try:
+		data = await gemini.generate_json(prompts["system"], prompts["user"], model=settings.ai_report_model)
+	except (gemini.GeminiError, asyncio.TimeoutError, json.JSONDecodeError) as e:
+		logger.error(f"{kind} text generation failed for goal {goal.id}: {str(e)}")
+		return None
+	if not isinstance(data, dict) or data.get("error") or not data.get(field):
+		return None
+	return str(data[field])
+
+
+async def _generate_report_texts(
+	db: AsyncSession,
+	kind: str,
+	goals: List[Any],
+	stats: Dict[UUID, ReportStats],
+	days: int,
+	build_prompt: Callable[..., Dict[str, Any]],
+	field: str,
+) -> Dict[UUID, Optional[str]]:
+	if not goals:
+		return {}
+	history = await _recent_history(db, [goal.id for goal in goals], since=date.today() - timedelta(days=days - 1))
+	texts = await asyncio.gather(*(
+		_generate_report_text(kind, goal, build_prompt(goal, history[goal.id], stats[goal.id].as_dict()), field)
+		for goal in goals
+	))
+	return {goal.id: text for goal, text in zip(goals, texts)}
+
+
+async def generate_week_report_texts(db: AsyncSession, goals: List[Any], stats: Dict[UUID, ReportStats]) -> Dict[UUID, Optional[str]]:
+	return await _generate_report_texts(db, "weekly_report", goals, stats, WEEK_DAYS, create_weekly_report_prompt, "ai_suggestion")
+
+
+async def generate_month_report_texts(db: AsyncSession, goals: List[Any], stats: Dict[UUID, ReportStats]) -> Dict[UUID, Optional[str]]:
+	return await _generate_report_texts(db, "monthly_report", goals, stats, MONTH_DAYS, create_monthly_report_prompt, "summary")
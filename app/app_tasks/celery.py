@@ -1,11 +1,12 @@
 from celery import Celery
+from celery.schedules import crontab
 from app.core.config import settings
 
 celery = Celery(
     "vibezone",
     broker=settings.redis_url,
     backend=settings.redis_url,
-    include=["app.app_tasks.tasks"],
+    include=["app.app_tasks.tasks", "app.app_emails.tasks", "app.app_subscriptions.tasks"],
 )
 
 celery.conf.update(
@@ -19,4 +20,28 @@ celery.conf.update(
     task_time_limit=60 * 60,
 )
 
-celery.conf.beat_schedule = {}
+celery.conf.beat_schedule = {
+    "sweep-daily-tasks": {
+        "task": "app.app_tasks.tasks.sweep_goals",
+        "schedule": crontab(hour=5, minute=0),
+        "args": ("daily",),
+    },
+    "sweep-weekly-reports": {
+        "task": "app.app_tasks.tasks.sweep_goals",
+        "schedule": crontab(hour=5, minute=15),
+        "args": ("weekly",),
+    },
+    "sweep-monthly-reports": {
+        "task": "app.app_tasks.tasks.sweep_goals",
+        "schedule": crontab(hour=5, minute=30),
+        "args": ("monthly",),
+    },
+    "drain-email-outbox": {
+        "task": "app.app_emails.tasks.drain_email_outbox",
+        "schedule": settings.email_drain_interval_seconds,
+    },
+    "process-stripe-events": {
+        "task": "app.app_subscriptions.tasks.process_stripe_events",
+        "schedule": settings.stripe_event_drain_interval_seconds,
+    },
+}
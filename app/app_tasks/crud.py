@@ -1,41 +1,61 @@
 from datetime import date, timedelta
-from typing import Optional, List
+from typing import Dict, Optional, List, Tuple
 from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from sqlalchemy import cast, func, literal, select, desc, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import joinedload
 
-from app.app_tasks.ai import generate_next_task
-from app.app_goals.models import Goal
+from app.common.pagination import PageParams, paginate
+from app.app_tasks.ai import generate_next_task, generate_next_tasks_batch
+from app.app_goals.models import Goal, GoalStatus
 from app.app_goals.schemas import GoalUpdate
-from app.app_goals.crud import get_active_goal, update_goal
+from app.app_goals.crud import bump_goal_version, get_active_goal, get_active_goals_by_ids, record_task_stats, record_task_stats_many, shard_clause, update_goal
 from app.app_tasks.schemas import TaskCreate
 from app.app_tasks.models import Task, TaskDifficulty, TaskStatus
+from app.app_users.models import User
 
 
-async def create_task(db: AsyncSession, task_in: TaskCreate) -> Task:
-	task = Task(
-		goal_id=task_in.goal_id,
-		title=task_in.title,
-		description=task_in.description,
-		assigned_date=task_in.assigned_date,
-		status=task_in.status,
-		difficulty=task_in.difficulty,
-		ai_generated=task_in.ai_generated,
+# goal_daily_stats keeps one counter per terminal status next to the assigned total
+STATS_COLUMNS = {TaskStatus.done: "done", TaskStatus.missed: "missed"}
+
+
+def _status_counts(status: TaskStatus, delta: int = 1) -> dict:
+	column = STATS_COLUMNS.get(status)
+	return {column: delta} if column else {}
+
+
+async def create_task(db: AsyncSession, task_in: TaskCreate) -> Optional[Task]:
+	# a goal gets one task per day; a concurrent run that already created it wins
+	res = await db.execute(
+		insert(Task)
+		.values(
+			goal_id=task_in.goal_id,
+			title=task_in.title,
+			description=task_in.description,
+			assigned_date=task_in.assigned_date,
+			status=task_in.status,
+			difficulty=task_in.difficulty,
+			ai_generated=task_in.ai_generated,
+		)
+		.on_conflict_do_nothing(index_elements=[Task.goal_id, Task.assigned_date])
+		.returning(Task)
 	)
-	db.add(task)
-	await db.commit()
-	await db.refresh(task)
+	task = res.scalar_one_or_none()
+	if task is None:
+		return None
+	await record_task_stats(db, task_in.goal_id, task_in.assigned_date, assigned=1, **_status_counts(task_in.status))
+	await bump_goal_version(db, task_in.goal_id)
 	return task
 
 
-async def list_goal_tasks(db: AsyncSession, goal_id: UUID) -> List[Task]:
-	res = await db.execute(select(Task).where(Task.goal_id == goal_id))
-	return res.scalars().all()
+async def list_goal_tasks(db: AsyncSession, goal_id: UUID, page: PageParams) -> Tuple[List[Task], Optional[str]]:
+	return await paginate(db, select(Task).where(Task.goal_id == goal_id), (Task.assigned_date, Task.id), page)
 
 
 async def get_task(db: AsyncSession, task_id: UUID) -> Optional[Task]:
-	res = await db.execute(select(Task).where(Task.id == task_id))
+	res = await db.execute(select(Task).options(joinedload(Task.goal)).where(Task.id == task_id))
 	return res.scalars().first()
 
 
@@ -59,14 +79,28 @@ async def get_active_task(db: AsyncSession, goal_id: UUID) -> Optional[Task]:
 	return res.scalars().first()
 
 
+async def get_latest_tasks(db: AsyncSession, goal_ids: List[UUID]) -> Dict[UUID, Task]:
+	res = await db.execute(
+		select(Task)
+		.where(Task.goal_id.in_(goal_ids))
+		.distinct(Task.goal_id)
+		.order_by(Task.goal_id, desc(Task.assigned_date), desc(Task.id))
+	)
+	return {task.goal_id: task for task in res.scalars().all()}
+
+
 async def update_task(db: AsyncSession, db_task: Task, status: TaskStatus) -> Task:
-	if status is not None:
-		db_task.status = status
-	
-	db.add(db_task)
-	await db.commit()
-	await db.refresh(db_task)
-	return db_task
+	if status is None or status == db_task.status:
+		return db_task
+
+	counts = _status_counts(db_task.status, -1)
+	for column, delta in _status_counts(status).items():
+		counts[column] = counts.get(column, 0) + delta
+	if counts:
+		await record_task_stats(db, db_task.goal_id, db_task.assigned_date, **counts)
+	res = await db.execute(update(Task).where(Task.id == db_task.id).values(status=status).returning(Task))
+	await bump_goal_version(db, db_task.goal_id)
+	return res.scalar_one()
 
 
 ###
@@ -74,12 +108,12 @@ def _today():
 	return date.today()
 
 
-async def create_daily_task_by_id(db: AsyncSession, user_id: UUID):
-	goal: Goal = await get_active_goal(db, user_id)
-	if not goal or goal.status != "active":
-		return
+async def _prepare_daily_task(db: AsyncSession, goal: Optional[Goal], last_task: Optional[Task]) -> Optional[Goal]:
+	if not goal or goal.status != GoalStatus.active:
+		return None
 
-	last_task = await get_active_task(db, goal.id)
+	if last_task and last_task.assigned_date >= _today():
+		return None
 	if last_task and last_task.status == TaskStatus.assigned:
 		await update_task(db, last_task, TaskStatus.missed)
 		new_task = TaskCreate(
@@ -96,10 +130,76 @@ async def create_daily_task_by_id(db: AsyncSession, user_id: UUID):
 		end_date = (goal.end_date or _today()) + timedelta(days=1)
 		
 		await update_goal(db, db_goal=goal, goal_in=GoalUpdate(end_date=end_date))
-		return
+		return None
+
+	return goal
+
+
+async def rollover_missed_tasks(
+	db: AsyncSession,
+	today: Optional[date] = None,
+	shard: Optional[int] = None,
+	shards: Optional[int] = None,
+) -> List[UUID]:
+	today = today or _today()
+	active_goals = (
+		select(Goal.id)
+		.join(User, User.id == Goal.user_id)
+		.where(Goal.status == GoalStatus.active, User.is_active == True)
+	)
+	if shards:
+		active_goals = active_goals.where(shard_clause(shard, shards))
+	latest_tasks = (
+		select(Task.id)
+		.where(Task.goal_id.in_(active_goals))
+		.distinct(Task.goal_id)
+		.order_by(Task.goal_id, desc(Task.assigned_date), desc(Task.id))
+	)
 
-	generated_task_data = await generate_next_task(db, goal)
-	payload = TaskCreate(
+	missed = await db.execute(
+		update(Task)
+		.where(Task.id.in_(latest_tasks), Task.status == TaskStatus.assigned, Task.assigned_date < today)
+		.values(status=TaskStatus.missed)
+		.returning(Task.id, Task.goal_id, Task.assigned_date)
+	)
+	rows = missed.all()
+	if not rows:
+		return []
+
+	created = await db.execute(
+		insert(Task).from_select(
+			["id", "goal_id", "title", "description", "assigned_date", "status", "difficulty", "ai_generated"],
+			select(
+				func.gen_random_uuid(),
+				Task.goal_id,
+				Task.title,
+				Task.description,
+				cast(literal(today), Task.assigned_date.type),
+				cast(literal(TaskStatus.assigned.value), Task.status.type),
+				Task.difficulty,
+				Task.ai_generated,
+			).where(Task.id.in_([row.id for row in rows]))
+		)
+		.on_conflict_do_nothing(index_elements=[Task.goal_id, Task.assigned_date])
+		.returning(Task.goal_id)
+	)
+	created_goal_ids = created.scalars().all()
+	goal_ids = [row.goal_id for row in rows]
+	await record_task_stats_many(
+		db,
+		[{"goal_id": row.goal_id, "day": row.assigned_date, "missed": 1} for row in rows]
+		+ [{"goal_id": goal_id, "day": today, "assigned": 1} for goal_id in created_goal_ids],
+	)
+	await db.execute(
+		update(Goal)
+		.where(Goal.id.in_(goal_ids))
+		.values(end_date=func.coalesce(Goal.end_date, today) + 1, version=Goal.version + 1)
+	)
+	return goal_ids
+
+
+def _generated_task_payload(goal: Goal, generated_task_data: dict) -> TaskCreate:
+	return TaskCreate(
 		title=generated_task_data.get("title"),
 		description=generated_task_data.get("description"),
 		assigned_date=_today(),
@@ -109,5 +209,31 @@ async def create_daily_task_by_id(db: AsyncSession, user_id: UUID):
 		ai_generated=True,
 		goal_id=goal.id,
 	)
-	
-	return await create_task(db, payload)
\ No newline at end of file
+
+
+async def create_daily_task_by_id(db: AsyncSession, user_id: UUID):
+	goal = await get_active_goal(db, user_id)
+	goal = await _prepare_daily_task(db, goal, await get_active_task(db, goal.id) if goal else None)
+	if not goal:
+		return
+
+	generated_task_data = await generate_next_task(db, goal)
+	return await create_task(db, _generated_task_payload(goal, generated_task_data))
+
+
+async def create_daily_tasks_by_ids(db: AsyncSession, goal_ids: List[UUID]) -> Dict[str, Optional[str]]:
+	outcomes: Dict[str, Optional[str]] = {str(goal_id): None for goal_id in goal_ids}
+	latest_tasks = await get_latest_tasks(db, goal_ids)
+	goals = []
+	for goal in await get_active_goals_by_ids(db, goal_ids):
+		goal = await _prepare_daily_task(db, goal, latest_tasks.get(goal.id))
+		if goal:
+			goals.append(goal)
+
+	generated = await generate_next_tasks_batch(db, goals)
+	for goal in goals:
+		if goal.id in generated:
+			await create_task(db, _generated_task_payload(goal, generated[goal.id]))
+		else:
+			outcomes[str(goal.id)] = "Task generation failed"
+	return outcomes
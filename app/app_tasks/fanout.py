@@ -0,0 +1,116 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Union
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import AsyncSessionLocal, commit
+
+
+logger = logging.getLogger(__name__)
+
+# handlers working on a batch may return {item key: error or None} so progress stays per item
+Outcomes = Dict[str, Optional[str]]
+
+
+@dataclass
+class FanoutProgress:
+	total: int = 0
+	succeeded: int = 0
+	failed: int = 0
+	failures: Dict[str, str] = field(default_factory=dict)
+
+	@property
+	def processed(self) -> int:
+		return self.succeeded + self.failed
+
+	def as_dict(self) -> Dict[str, Any]:
+		return {
+			"total": self.total,
+			"processed": self.processed,
+			"succeeded": self.succeeded,
+			"failed": self.failed,
+			"failures": dict(self.failures),
+		}
+
+	def record(self, outcomes: Outcomes) -> None:
+		for key, error in outcomes.items():
+			if error is None:
+				self.succeeded += 1
+			else:
+				self.failed += 1
+				self.failures[key] = error
+
+
+async def _iterate(items: Union[Iterable[Any], AsyncIterable[Any]]):
+	if hasattr(items, "__aiter__"):
+		async for item in items:
+			yield item
+	else:
+		for item in items:
+			yield item
+
+
+async def batched(items: Union[Iterable[Any], AsyncIterable[Any]], size: int) -> AsyncIterator[List[Any]]:
+	batch: List[Any] = []
+	async for item in _iterate(items):
+		batch.append(item)
+		if len(batch) >= size:
+			yield batch
+			batch = []
+	if batch:
+		yield batch
+
+
+def _members(item: Any) -> List[Any]:
+	return item if isinstance(item, list) else [item]
+
+
+async def fan_out(
+	items: Union[Iterable[Any], AsyncIterable[Any]],
+	handler: Callable[[AsyncSession, Any], Awaitable[Any]],
+	concurrency: int,
+	on_progress: Optional[Callable[[FanoutProgress], Awaitable[None]]] = None,
+	progress_every: int = 1,
+) -> FanoutProgress:
+	concurrency = max(1, concurrency)
+	progress = FanoutProgress()
+	queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+
+	next_report = progress_every
+
+	async def producer():
+		try:
+			async for item in _iterate(items):
+				progress.total += len(_members(item))
+				await queue.put(item)
+		finally:
+			for _ in range(concurrency):
+				await queue.put(None)
+
+	async def worker():
+		nonlocal next_report
+		while True:
+			item = await queue.get()
+			if item is None:
+				return
+			async with AsyncSessionLocal() as db:
+				try:
+					outcomes = await handler(db, item)
+					await commit(db)
+				except Exception as e:
+					await db.rollback()
+					logger.error(f"Fan-out handler failed for {item}: {str(e)}")
+					outcomes = {str(member): str(e) for member in _members(item)}
+			if not isinstance(outcomes, dict):
+				outcomes = {str(member): None for member in _members(item)}
+			progress.record(outcomes)
+			if on_progress and progress.processed >= next_report:
+				next_report = progress.processed + progress_every
+				await on_progress(progress)
+
+	await asyncio.gather(producer(), *(worker() for _ in range(concurrency)))
+	if on_progress:
+		await on_progress(progress)
+	return progress
@@ -1,6 +1,6 @@
 import enum
 
-from sqlalchemy import Column, String, Text, Boolean, Date, Enum as SQLEnum, ForeignKey
+from sqlalchemy import Column, String, Text, Boolean, Date, Enum as SQLEnum, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 
@@ -29,4 +29,9 @@ class Task(Base, IDMixin):
 	difficulty = Column(SQLEnum(TaskDifficulty), nullable=False, default=TaskDifficulty.medium)
 	ai_generated = Column(Boolean, nullable=False, default=True)
 
-	goal = relationship("Goal", back_populates="tasks", lazy="selectin")
+	goal = relationship("Goal", back_populates="tasks", lazy="raise")
+
+	__table_args__ = (
+		Index("ix_tasks_goal_id_assigned_date_id", "goal_id", "assigned_date", "id"),
+		Index("ux_tasks_goal_id_assigned_date", "goal_id", "assigned_date", unique=True),
+	)
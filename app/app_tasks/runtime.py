@@ -0,0 +1,68 @@
+import asyncio
+import threading
+from typing import Any, Coroutine, Optional
+
+from celery.signals import worker_process_init, worker_process_shutdown
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core import database
+from app.lib import gemini, redis_client
+
+
+# One long-lived event loop (on its own thread) and one async engine per worker process.
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_thread: Optional[threading.Thread] = None
+_engine: Optional[AsyncEngine] = None
+_lock = threading.Lock()
+
+
+def start() -> None:
+	global _loop, _thread, _engine
+	with _lock:
+		if _loop is not None:
+			return
+
+		# Drop connections inherited from the parent process without closing them
+		# under the parent's feet, then bind sessions to this process' own pool.
+		database.engine.sync_engine.dispose(close=False)
+		_engine = database.make_async_engine()
+		database.AsyncSessionLocal.configure(bind=_engine)
+
+		_loop = asyncio.new_event_loop()
+		_thread = threading.Thread(target=_loop.run_forever, name="worker-event-loop", daemon=True)
+		_thread.start()
+
+
+def run(coro: Coroutine[Any, Any, Any]) -> Any:
+	if _loop is None:
+		start()
+	return asyncio.run_coroutine_threadsafe(coro, _loop).result()
+
+
+async def _aclose() -> None:
+	await gemini.aclose()
+	await redis_client.aclose()
+	await _engine.dispose()
+
+
+def stop() -> None:
+	global _loop, _thread, _engine
+	with _lock:
+		if _loop is None:
+			return
+
+		asyncio.run_coroutine_threadsafe(_aclose(), _loop).result(timeout=30)
+		_loop.call_soon_threadsafe(_loop.stop)
+		_thread.join(timeout=5)
+		_loop.close()
+		_loop = _thread = _engine = None
+
+
+@worker_process_init.connect
+def _on_worker_process_init(**kwargs):
+	start()
+
+
+@worker_process_shutdown.connect
+def _on_worker_process_shutdown(**kwargs):
+	stop()
@@ -1,5 +1,5 @@
 import enum
-from typing import Optional
+from typing import Dict, Optional
 from datetime import date
 from uuid import UUID
 
@@ -31,3 +31,19 @@ class TaskResponse(BaseModel):
 	class Config:
 		from_attributes = True
 
+
+class FanoutJobResponse(BaseModel):
+	job_id: str
+	status: str
+	total: int = 0
+	processed: int = 0
+	succeeded: int = 0
+	failed: int = 0
+	failures: Dict[str, str] = {}
+
+
+class GeneratedTask(BaseModel):
+	title: str = Field(..., max_length=255)
+	description: Optional[str] = None
+	difficulty: TaskDifficulty = TaskDifficulty.medium
+	status: TaskStatus = TaskStatus.assigned
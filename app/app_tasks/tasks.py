@@ -1,107 +1,146 @@
-from datetime import date, timedelta
+import asyncio
+from datetime import date
+from typing import AsyncIterator, List, Tuple
 from uuid import UUID
 
-from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import engine
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, commit
+from app.app_tasks import runtime
 from app.app_tasks.celery import celery
+from app.app_goals.crud import get_active_goals, get_active_goals_by_ids
 from app.app_goals.models import Goal
-from app.app_goals.schemas import GoalUpdate
-from app.app_goals.crud import get_active_goal, update_goal
-from app.app_tasks.models import TaskDifficulty
-from app.app_tasks.schemas import TaskCreate, TaskStatus
-from app.app_tasks.crud import create_task, get_active_task, get_last_incomplete_task, update_task
-from app.app_tasks.utils import remove_user_tasks
-from app.app_reports.schemas import MonthlyReportRequest, WeeklyReportRequest
+from app.app_tasks.crud import create_daily_task_by_id, create_daily_tasks_by_ids, rollover_missed_tasks
+from app.app_tasks.fanout import FanoutProgress, batched, fan_out
 from app.app_reports.crud import create_monthly_report, create_weekly_report
-from app.app_tasks.ai import generate_month_report, generate_next_task, generate_week_report
+from app.app_reports.engine import MONTH_DAYS, WEEK_DAYS, monthly_report_request, report_stats, weekly_report_request
+from app.app_tasks.ai import generate_month_report_texts, generate_week_report_texts
+from app.app_users.crud import iter_active_goal_ids
 
 
-AsyncSessionLocal = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
-
 def _today():
 	return date.today()
 
+async def _create_weekly_reports(db: AsyncSession, goals: List[Goal]):
+	stats = await report_stats(db, [goal.id for goal in goals], WEEK_DAYS)
+	texts = await generate_week_report_texts(db, goals, stats)
+	return [await create_weekly_report(db, weekly_report_request(stats[goal.id], texts.get(goal.id))) for goal in goals]
+
+
+async def _create_monthly_reports(db: AsyncSession, goals: List[Goal]):
+	stats = await report_stats(db, [goal.id for goal in goals], MONTH_DAYS)
+	texts = await generate_month_report_texts(db, goals, stats)
+	return [await create_monthly_report(db, monthly_report_request(stats[goal.id], texts.get(goal.id))) for goal in goals]
+
+
+async def _create_weekly_reports_for_goals(db: AsyncSession, goal_ids: List[UUID]):
+	return await _create_weekly_reports(db, await get_active_goals_by_ids(db, goal_ids))
+
+
+async def _create_monthly_reports_for_goals(db: AsyncSession, goal_ids: List[UUID]):
+	return await _create_monthly_reports(db, await get_active_goals_by_ids(db, goal_ids))
+
+
+async def _goal_ids(rows: AsyncIterator[Tuple[UUID, UUID]]) -> AsyncIterator[UUID]:
+	async for _, goal_id in rows:
+		yield goal_id
+
+
+# Legacy per-user tasks, kept so ETA messages published before the sweep still run.
 @celery.task(bind=True, autoretry_for=(Exception,), retry_backoff=True, retry_kwargs={"max_retries": 5})
 def create_daily_task(self, user_id: UUID):
 	async def run():
 		async with AsyncSessionLocal() as db:
-			goal: Goal = await get_active_goal(db, user_id)
-			if not goal or goal.status != "active":
-				return
-
-			last_task = await get_active_task(db, goal.id)
-			if last_task and last_task.status == TaskStatus.assigned:
-				update_task(db, last_task, TaskStatus.missed)
-				new_task = TaskCreate(
-					title=last_task.title,
-					description=last_task.description,
-					assigned_date=_today(),
-					difficulty=last_task.difficulty,
-					status=TaskStatus.assigned,
-					ai_generated=last_task.ai_generated,
-					goal_id=goal.id,
-				)
-				await create_task(db, new_task)
-
-				end_date = (goal.end_date or _today()) + timedelta(days=1)
-				
-				await update_goal(db, db_goal=goal, goal_in=GoalUpdate(end_date=end_date))
-				return
-
-			generated_task_data = generate_next_task(goal)
-			payload = TaskCreate(
-				title=generated_task_data.get("title"),
-				description=generated_task_data.get("description"),
-				assigned_date=_today(),
-				due_date=generated_task_data.get("due_date"),
-				difficulty=TaskDifficulty(generated_task_data.get("difficulty", "medium")),
-				status=TaskStatus(generated_task_data.get("status", "assigned")),
-				ai_generated=True,
-				goal_id=goal.id,
-			)
-			
-			return await create_task(db, payload)
-	import asyncio as _a; _a.run(run())
+			await create_daily_task_by_id(db, user_id)
+			await commit(db)
+	runtime.run(run())
 
 
 @celery.task(bind=True, autoretry_for=(Exception,), retry_backoff=True, retry_kwargs={"max_retries": 5})
 def create_weekly_task(self, user_id: str):
 	async def run():
 		async with AsyncSessionLocal() as db:
-			goal = await get_active_goal(db, user_id)
-			if not goal:
-				return
-			data = generate_week_report(goal)
-			payload = WeeklyReportRequest(
-				goal_id=goal.id,
-				week_start=data.get("week_start"),
-				week_end=data.get("week_end"),
-				completed_tasks=int(data.get("completed_tasks", 0)),
-				missed_tasks=int(data.get("missed_tasks", 0)),
-				ai_suggestion=data.get("ai_suggestion"),
-			)
-			await create_weekly_report(db, payload)
-	import asyncio as _a; _a.run(run())
+			await _create_weekly_reports(db, await get_active_goals(db, [user_id]))
+			await commit(db)
+	runtime.run(run())
 
 
 @celery.task(bind=True, autoretry_for=(Exception,), retry_backoff=True, retry_kwargs={"max_retries": 5})
 def create_monthly_task(self, user_id: str):
 	async def run():
 		async with AsyncSessionLocal() as db:
-			goal = await get_active_goal(db, user_id)
-			if not goal:
-				return
-			data = generate_month_report(goal)
-			payload = MonthlyReportRequest(
-				goal_id=goal.id,
-				month=int(data.get("month")),
-				year=int(data.get("year")),
-				completed_tasks=int(data.get("completed_tasks", 0)),
-				missed_tasks=int(data.get("missed_tasks", 0)),
-				summary=data.get("summary"),
-				performance_score=float(data.get("performance_score")) if data.get("performance_score") is not None else None,
+			await _create_monthly_reports(db, await get_active_goals(db, [user_id]))
+			await commit(db)
+	runtime.run(run())
+
+
+SWEEP_CADENCE_DAYS = {"daily": None, "weekly": 7, "monthly": 30}
+
+
+@celery.task(bind=True)
+def sweep_goals(self, cadence: str):
+	day = _today().isoformat()
+	shards = settings.sweep_shards
+	for shard in range(shards):
+		process_goal_shard.delay(cadence, shard, shards, day)
+	return {"cadence": cadence, "shards": shards, "day": day}
+
+
+@celery.task(bind=True)
+def process_goal_shard(self, cadence: str, shard: int, shards: int, day: str):
+	async def run():
+		today = date.fromisoformat(day)
+		async with AsyncSessionLocal() as db:
+			without_task_on = None
+			if cadence == "daily":
+				# unfinished tasks are rolled over in bulk; only goals still without a task today need the model
+				await rollover_missed_tasks(db, today, shard, shards)
+				await commit(db)
+				without_task_on = today
+			goal_ids = _goal_ids(iter_active_goal_ids(
+				db,
+				chunk_size=settings.active_goal_chunk_size,
+				shard=shard,
+				shards=shards,
+				cadence_days=SWEEP_CADENCE_DAYS[cadence],
+				today=today,
+				without_task_on=without_task_on,
+			))
+
+			if cadence == "daily":
+				handler = create_daily_tasks_by_ids
+			elif cadence == "weekly":
+				handler = _create_weekly_reports_for_goals
+			else:
+				handler = _create_monthly_reports_for_goals
+
+			progress = await fan_out(batched(goal_ids, settings.ai_batch_size), handler, concurrency=settings.task_fanout_concurrency)
+		return progress.as_dict()
+	return runtime.run(run())
+
+
+@celery.task(bind=True)
+def create_daily_tasks_for_active_goals(self):
+	# the coroutine runs on the worker's loop thread, where Celery's thread-local request is empty,
+	# so the task id is captured here and the blocking backend write is pushed off the loop
+	task_id = self.request.id
+
+	async def report(progress: FanoutProgress):
+		await asyncio.to_thread(self.update_state, task_id=task_id, state="PROGRESS", meta=progress.as_dict())
+
+	async def run():
+		today = _today()
+		async with AsyncSessionLocal() as db:
+			await rollover_missed_tasks(db, today)
+			await commit(db)
+			goal_ids = _goal_ids(iter_active_goal_ids(db, chunk_size=settings.active_goal_chunk_size, without_task_on=today))
+			progress = await fan_out(
+				batched(goal_ids, settings.ai_batch_size),
+				create_daily_tasks_by_ids,
+				concurrency=settings.task_fanout_concurrency,
+				on_progress=report,
+				progress_every=settings.task_fanout_progress_every,
 			)
-			await create_monthly_report(db, payload)
-	import asyncio as _a; _a.run(run())
\ No newline at end of file
+		return progress.as_dict()
+	return runtime.run(run())
@@ -1,24 +1,68 @@
 import json
-from typing import Any, Dict, List
+import math
+from typing import Any, Dict, List, Optional, Tuple
 
-from app.app_tasks import celery
 from app.app_goals.models import Goal
 
 
-def _tasks_to_history(tasks: List[Any], max_entries: int = 120) -> List[Dict[str, Any]]:
+HISTORY_WINDOW = 120
+
+STATUS_CODES = {"assigned": "a", "done": "d", "missed": "m"}
+DIFFICULTY_CODES = {"easy": "e", "medium": "m", "hard": "h"}
+
+# Short keys and one-letter enums keep the history cheap in input tokens;
+# the legend travels with every payload so the model can decode it.
+HISTORY_LEGEND = {
+	"t": "title",
+	"d": "description",
+	"a": "assigned_date",
+	"s": "status a=assigned d=done m=missed",
+	"f": "difficulty e=easy m=medium h=hard",
+}
+
+
+def _enum_value(value: Any) -> Any:
+	return getattr(value, "value", value)
+
+
+def _tasks_to_history(tasks: List[Any], max_entries: int = HISTORY_WINDOW) -> List[Dict[str, Any]]:
 	history: List[Dict[str, Any]] = []
 	for task in tasks[-max_entries:]:
 		entry = {
-			"title": getattr(task, "title", None),
-			"description": getattr(task, "description", None),
-			"assigned_date": getattr(task, "assigned_date", None).isoformat() if getattr(task, "assigned_date", None) else None,
-			"status": getattr(task, "status", None),
-			"difficulty": getattr(task, "difficulty", None),
+			"t": getattr(task, "title", None),
+			"a": getattr(task, "assigned_date", None).isoformat() if getattr(task, "assigned_date", None) else None,
+			"s": STATUS_CODES.get(_enum_value(getattr(task, "status", None))),
+			"f": DIFFICULTY_CODES.get(_enum_value(getattr(task, "difficulty", None))),
 		}
+		if getattr(task, "description", None):
+			entry["d"] = task.description
 		history.append(entry)
 	return history
 
 
+def _goal_to_payload(goal: Goal) -> Dict[str, Any]:
+	return {
+		"title": getattr(goal, "title", None),
+		"description": getattr(goal, "description", None),
+		"start_date": getattr(goal, "start_date", None).isoformat() if getattr(goal, "start_date", None) else None,
+		"end_date": getattr(goal, "end_date", None).isoformat() if getattr(goal, "end_date", None) else None,
+		"target_days": getattr(goal, "target_days", None)
+	}
+
+
+def _dumps(payload: Dict[str, Any]) -> str:
+	return json.dumps(payload, ensure_ascii=False, default=str, separators=(",", ":"))
+
+
+def estimate_tokens(*texts: str) -> int:
+	return sum(math.ceil(len(text) / 4) for text in texts)
+
+
+def _prompt(system: str, user_payload: Dict[str, Any]) -> Dict[str, Any]:
+	user = _dumps(user_payload)
+	return {"system": system, "user": user, "estimated_tokens": estimate_tokens(system, user)}
+
+
 #system prompts
 NEXT_TASK_SYSTEM_PROMPT = """You are an AI Task Planner. ALWAYS return valid JSON only, matching the "next_task" schema provided in the user message. Do NOT include any explanatory text. Use deterministic behavior and avoid hallucinations. Dates MUST use ISO format YYYY-MM-DD. If you cannot compute a sensible task, return {"error":"<short reason>"}.
 
@@ -31,14 +75,23 @@ Business constraints:
 - Output numeric fields as numbers (not strings).
 Return only a single JSON object matching the schema specified in the user payload.
 """
-WEEKLY_REPORT_SYSTEM_PROMPT = """You are the AI Weekly Reporter of a Task Planner App. ALWAYS return valid JSON only, matching the "weekly_report" schema provided in the user message. No extra text. Use ISO dates (YYYY-MM-DD). The "history" array will include full last-week task activity. Compute completed_tasks and missed_tasks by counting history. Provide an actionable ai_suggestion <= 500 chars. If invalid input, return {"error":"..."}."""
+NEXT_TASKS_BATCH_SYSTEM_PROMPT = """You are an AI Task Planner. The user message contains a "goals" array; every entry has a "goal_id", the goal and its task history. ALWAYS return valid JSON only: a single object {"tasks": [...]} holding exactly one next task per goal_id, each matching the "next_task" schema provided in the user message. Do NOT include any explanatory text. Use deterministic behavior and avoid hallucinations. Dates MUST use ISO format YYYY-MM-DD. Plan every goal independently, using only its own history. If you cannot compute a sensible task for a goal, return {"goal_id":"<id>","error":"<short reason>"} for that entry.
 
-MONTHLY_REPORT_SYSTEM_PROMPT = """You are the AI Monthly Analyst. ALWAYS return ONLY JSON matching the "monthly_report" schema provided in the user message. Use last 30 days history provided. Compute completed_tasks and missed_tasks by counting history. Compute a performance_score in percent (0.00 - 100.00) with two decimals. Weight last 7 days 40%, prior days 60% as guidance (model may adapt for less data). Summary <= 1000 chars. If cannot produce, return {"error":"..."}."""
+Business constraints:
+- Max allowed goal duration (including AI extensions) is 120 days (4 months). Do not propose task that would make the goal exceed this.
+- Use difficult_level in ["easy","medium","hard"].
+- Use action in ["assigned","done","missed"] — for a new next-day task use "assigned".
+- Title <= 100 chars. Description <= 2000 chars.
+- Validate and ensure "assigned_date" is the date on which the task is being generated (i.e today).
+- Output numeric fields as numbers (not strings).
+"""
+WEEKLY_REPORT_SYSTEM_PROMPT = """You are the AI Weekly Reporter of a Task Planner App. ALWAYS return valid JSON only, matching the "weekly_report" schema provided in the user message. No extra text. The "history" array holds last-week task activity and "stats" holds the final numbers for the week; refer to them, never recompute or restate different numbers. Provide an actionable ai_suggestion <= 500 chars. If invalid input, return {"error":"..."}."""
+
+MONTHLY_REPORT_SYSTEM_PROMPT = """You are the AI Monthly Analyst. ALWAYS return ONLY JSON matching the "monthly_report" schema provided in the user message. Use the last 30 days history provided for context; "stats" holds the final numbers for the period, including performance_score (percent, weighted towards the last 7 days); refer to them, never recompute or restate different numbers. Summary <= 1000 chars. If cannot produce, return {"error":"..."}."""
 
 
 #full prompt builders
-def create_next_task_prompt(goal: Goal, tasks: List[Any]) -> Dict[str, str]:
-	history = _tasks_to_history(tasks)
+def create_next_task_prompt(goal: Goal, tasks: List[Any]) -> Dict[str, Any]:
 	user_payload = {
 		"output_schema": {
 			"title": "string",
@@ -47,73 +100,62 @@ def create_next_task_prompt(goal: Goal, tasks: List[Any]) -> Dict[str, str]:
 			"status": "assigned",
 			"difficulty": "easy|medium|hard",
 		},
-		"history": history,
-		"goal": {
-			"title": getattr(goal, "title", None),
-			"description": getattr(goal, "description", None),
-			"start_date": getattr(goal, "start_date", None).isoformat() if getattr(goal, "start_date", None) else None,
-			"end_date": getattr(goal, "end_date", None).isoformat() if getattr(goal, "end_date", None) else None,
-			"target_days": getattr(goal, "target_days", None)
-		}
+		"history_keys": HISTORY_LEGEND,
+		"history": _tasks_to_history(tasks),
+		"goal": _goal_to_payload(goal)
 	}
-	json_user_payload = json.dumps(user_payload, ensure_ascii=False, 
-	default=str, indent=2)
+	return _prompt(NEXT_TASK_SYSTEM_PROMPT, user_payload)
 
-	return {"system": NEXT_TASK_SYSTEM_PROMPT, "user": json_user_payload}
 
-
-def create_weekly_report_prompt(goal: Goal, tasks: List[Any]) -> Dict[str, str]:
-	history = _tasks_to_history(tasks)
+def create_next_tasks_batch_prompt(goals_with_tasks: List[Tuple[Goal, List[Any]]]) -> Dict[str, Any]:
 	user_payload = {
-		"schema": {
-			"week_start": "YYYY-MM-DD",
-			"week_end": "YYYY-MM-DD",
-			"completed_tasks": "int",
-			"missed_tasks": "int",
-			"ai_suggestion": "string"
-		},
-		"goal": {
-			"title": getattr(goal, "title", None),
-			"description": getattr(goal, "description", None),
-			"start_date": getattr(goal, "start_date", None).isoformat() if getattr(goal, "start_date", None) else None,
-			"end_date": getattr(goal, "end_date", None).isoformat() if getattr(goal, "end_date", None) else None,
-			"target_days": getattr(goal, "target_days", None)
+		"next_task": {
+			"goal_id": "string",
+			"title": "string",
+			"description": "string",
+			"assigned_date": "YYYY-MM-DD",
+			"status": "assigned",
+			"difficulty": "easy|medium|hard",
 		},
-		"history": history
-	} 
-	json_user_payload = json.dumps(user_payload, ensure_ascii=False, 
-	default=str, indent=2)
+		"history_keys": HISTORY_LEGEND,
+		"goals": [
+			{
+				"goal_id": str(goal.id),
+				"goal": _goal_to_payload(goal),
+				"history": _tasks_to_history(tasks),
+			}
+			for goal, tasks in goals_with_tasks
+		]
+	}
+	return _prompt(NEXT_TASKS_BATCH_SYSTEM_PROMPT, user_payload)
 
-	return {"system": WEEKLY_REPORT_SYSTEM_PROMPT, "user": json_user_payload}
 
+def create_weekly_report_prompt(goal: Goal, tasks: List[Any], stats: Dict[str, Any]) -> Dict[str, Any]:
+	user_payload = {
+		"weekly_report": {"ai_suggestion": "string"},
+		"goal": _goal_to_payload(goal),
+		"stats": stats,
+		"history_keys": HISTORY_LEGEND,
+		"history": _tasks_to_history(tasks)
+	}
+	return _prompt(WEEKLY_REPORT_SYSTEM_PROMPT, user_payload)
 
-def create_monthly_report_prompt(goal: Goal, tasks: List[Any]) -> Dict[str, str]:
-	history = _tasks_to_history(tasks)
+
+def create_monthly_report_prompt(goal: Goal, tasks: List[Any], stats: Dict[str, Any]) -> Dict[str, Any]:
 	user_payload = {
-		"schema": {
-			"month": "1-12",
-			"year": "YYYY",
-			"completed_tasks": "int",
-			"missed_tasks": "int",
-			"summary": "string",
-			"performance_score": "0.00-100.00"
-		},
-		"goal": {
-			"title": getattr(goal, "title", None),
-			"description": getattr(goal, "description", None),
-			"start_date": getattr(goal, "start_date", None).isoformat() if getattr(goal, "start_date", None) else None,
-			"end_date": getattr(goal, "end_date", None).isoformat() if getattr(goal, "end_date", None) else None,
-			"target_days": getattr(goal, "target_days", None)
-		},
-		"history": history
-	} 
-	json_user_payload = json.dumps(user_payload, ensure_ascii=False, 
-	default=str, indent=2)
-	
-	return {"system": MONTHLY_REPORT_SYSTEM_PROMPT, "user": json_user_payload}
+		"monthly_report": {"summary": "string"},
+		"goal": _goal_to_payload(goal),
+		"stats": stats,
+		"history_keys": HISTORY_LEGEND,
+		"history": _tasks_to_history(tasks)
+	}
+	return _prompt(MONTHLY_REPORT_SYSTEM_PROMPT, user_payload)
 
 
-def remove_user_tasks(task_ids: str):
+def remove_user_tasks(task_ids: Optional[str]):
+    if not task_ids:
+        return
+    from app.app_tasks.celery import celery
     if ',' in task_ids:
         ids = task_ids.split(",")
         for task_id in ids:
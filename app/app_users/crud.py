@@ -1,36 +1,42 @@
-from typing import List, Optional
+from datetime import date
+from typing import AsyncIterator, Optional, Tuple
 from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import delete, select
+from sqlalchemy import delete, exists, insert, select, update
 
 from app.app_goals.models import Goal, GoalStatus
-from app.core.security import hash_password
+from app.app_tasks.models import Task
+from app.app_goals.crud import cadence_clauses, shard_clause
+from app.core.database import on_commit
+from app.core.passwords import hash_password
+from app.core.principal import invalidate_principal
+from app.core.security import forget_verified_tokens
 from app.app_users.models import PasswordResetToken, User
 from app.app_users.schemas import AuthRequest, OAuthRequest, PasswordResetTokenRequest
 
 
+async def _forget_user(email: str) -> None:
+	await forget_verified_tokens(email)
+	await invalidate_principal(email)
+
+
 async def create_user(db: AsyncSession, user_in: AuthRequest) -> User:
-	user = User(
-		email=user_in.email,
-		password_hash=hash_password(user_in.password)
+	res = await db.execute(
+		insert(User)
+		.values(email=user_in.email, password_hash=await hash_password(user_in.password))
+		.returning(User)
 	)
-	db.add(user)
-	await db.commit()
-	await db.refresh(user)
-	return user
+	return res.scalar_one()
 
 
 async def create_oauth_user(db: AsyncSession, user_in: OAuthRequest) -> User:
-	user = User(
-		email=user_in.email,
-		provider=user_in.provider,
-        provider_id=user_in.provider_id
+	res = await db.execute(
+		insert(User)
+		.values(email=user_in.email, provider=user_in.provider, provider_id=user_in.provider_id)
+		.returning(User)
 	)
-	db.add(user)
-	await db.commit()
-	await db.refresh(user)
-	return user
+	return res.scalar_one()
     
 
 async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
@@ -44,23 +50,23 @@ async def get_user_by_id(db: AsyncSession, user_id: UUID) -> Optional[User]:
 
 
 async def soft_delete_user(db: AsyncSession, db_user: User) -> None:
-	db_user.is_active = False
-	db.add(db_user)
-	await db.commit()
-	await db.refresh(db_user)
+	await db.execute(update(User).where(User.id == db_user.id).values(is_active=False))
+	email = db_user.email
+	on_commit(db, lambda: _forget_user(email))
 	return None
 
 
 async def create_reset_token(db: AsyncSession, user_id: UUID, password_reset_token_in: PasswordResetTokenRequest) -> PasswordResetToken:
-	reset_token = PasswordResetToken(
-		user_id=user_id, 
-		token=password_reset_token_in.token,
-		expires_at=password_reset_token_in.expires_at
+	res = await db.execute(
+		insert(PasswordResetToken)
+		.values(
+			user_id=user_id,
+			token=password_reset_token_in.token,
+			expires_at=password_reset_token_in.expires_at,
+		)
+		.returning(PasswordResetToken)
 	)
-	db.add(reset_token)
-	await db.commit()
-	await db.refresh(reset_token)
-	return reset_token
+	return res.scalar_one()
 
 
 async def get_reset_token_by_value(db: AsyncSession, token_value: str) -> Optional[PasswordResetToken]:
@@ -72,14 +78,48 @@ async def delete_reset_tokens(db: AsyncSession, user_id: UUID) :
     await db.execute(delete(PasswordResetToken).where(PasswordResetToken.user_id == user_id))
     
 
-async def reset_password_action(db: AsyncSession, db_user: User, db_token: PasswordResetToken, new_password: str):
-	db_user.password_hash = hash_password(new_password)
-	db_token.used = True
-	await db.commit()
+async def update_password_hash(db: AsyncSession, user_id: UUID, password_hash: str):
+	await db.execute(update(User).where(User.id == user_id).values(password_hash=password_hash))
 
 
-async def get_users_with_active_goal(db: AsyncSession) -> Optional[List[User]]:
-	users = await db.execute(
-		select(User).where(User.goals.any(Goal.status == GoalStatus.active))
+async def reset_password_action(db: AsyncSession, db_user: User, db_token: PasswordResetToken, new_password: str):
+	await db.execute(update(User).where(User.id == db_user.id).values(password_hash=await hash_password(new_password)))
+	await db.execute(update(PasswordResetToken).where(PasswordResetToken.id == db_token.id).values(used=True))
+	email = db_user.email
+	on_commit(db, lambda: _forget_user(email))
+
+
+async def iter_active_goal_ids(
+	db: AsyncSession,
+	chunk_size: int = 1000,
+	shard: Optional[int] = None,
+	shards: Optional[int] = None,
+	cadence_days: Optional[int] = None,
+	today: Optional[date] = None,
+	without_task_on: Optional[date] = None,
+) -> AsyncIterator[Tuple[UUID, UUID]]:
+	query = (
+		select(Goal.user_id, Goal.id)
+		.join(User, User.id == Goal.user_id)
+		.where(Goal.status == GoalStatus.active, User.is_active == True)
+		.order_by(Goal.id)
+		.limit(chunk_size)
 	)
-	return users.scalars().all()
+	if shards:
+		query = query.where(shard_clause(shard, shards))
+	if cadence_days:
+		query = query.where(*cadence_clauses(cadence_days, today))
+	if without_task_on:
+		query = query.where(~exists().where(Task.goal_id == Goal.id, Task.assigned_date == without_task_on))
+
+	last_goal_id = None
+	while True:
+		chunk_query = query if last_goal_id is None else query.where(Goal.id > last_goal_id)
+		rows = (await db.execute(chunk_query)).all()
+		# release the connection between chunks instead of idling in a transaction
+		await db.commit()
+		for user_id, goal_id in rows:
+			yield user_id, goal_id
+		if len(rows) < chunk_size:
+			return
+		last_goal_id = rows[-1][1]
@@ -22,9 +22,9 @@ class User(Base, IDMixin, CreatedUpdatedAtMixin):
     provider = Column(SQLEnum(AuthProvider), nullable=False, default=AuthProvider.email)
     provider_id = Column(Text, nullable=True)
     
-    goals = relationship("Goal", back_populates="user", cascade="all, delete-orphan", lazy="selectin")
-    password_reset_tokens = relationship("PasswordResetToken", back_populates="user", cascade="all, delete-orphan", lazy="selectin")
-    subscriptions = relationship("StripeSubscription", back_populates="user", cascade="all, delete-orphan", lazy="selectin")
+    goals = relationship("Goal", back_populates="user", cascade="all, delete-orphan", passive_deletes=True, lazy="raise")
+    password_reset_tokens = relationship("PasswordResetToken", back_populates="user", cascade="all, delete-orphan", passive_deletes=True, lazy="raise")
+    subscriptions = relationship("StripeSubscription", back_populates="user", cascade="all, delete-orphan", passive_deletes=True, lazy="raise")
 
 
 class PasswordResetToken(Base, IDMixin, CreatedUpdatedAtMixin):
@@ -35,4 +35,4 @@ class PasswordResetToken(Base, IDMixin, CreatedUpdatedAtMixin):
 	expires_at = Column(DateTime(timezone=True), nullable=False)
 	used = Column(Boolean, nullable=False, default=False)
 
-	user = relationship("User", back_populates="password_reset_tokens", lazy="selectin")
\ No newline at end of file
+	user = relationship("User", back_populates="password_reset_tokens", lazy="raise")
\ No newline at end of file
@@ -0,0 +1,22 @@
+import hashlib
+
+from fastapi import Request, Response, status
+
+from app.common.pagination import PageParams
+
+
+def goal_etag(goal, resource: str, page: PageParams) -> str:
+	raw = f"{resource}:{goal.id}:{goal.version}:{page.limit}:{page.cursor or ''}"
+	return '"' + hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+	header = request.headers.get("if-none-match")
+	if not header:
+		return False
+	candidates = [candidate.strip() for candidate in header.split(",")]
+	return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def not_modified(etag: str) -> Response:
+	return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Column, DateTime, func
+from sqlalchemy import Column, DateTime, Integer, Text, func
 from sqlalchemy.dialects.postgresql import UUID
 
 
@@ -11,3 +11,9 @@ class CreatedUpdatedAtMixin:
 
 class IDMixin:
   id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+
+
+class OutboxMixin:
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    last_error = Column(Text, nullable=True)
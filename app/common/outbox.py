@@ -0,0 +1,110 @@
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Any, Callable, List, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import case, func, literal, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import on_commit
+
+
+logger = logging.getLogger(__name__)
+
+
+# Rows staged in the caller's transaction and drained later by a Celery task. The model needs a
+# status column plus the OutboxMixin columns, and the timestamp column named by done_at.
+class Outbox:
+    def __init__(
+        self,
+        model: Any,
+        name: str,
+        pending: Any,
+        done: Any,
+        failed: Any,
+        done_at: str,
+        max_attempts: int,
+        retry_base_seconds: int,
+        schedule: Callable[[], None],
+        in_flight: Any = None,
+        lease_seconds: int = 0,
+    ):
+        self.model = model
+        self.name = name
+        self.pending = pending
+        self.done = done
+        self.failed = failed
+        self.done_at = done_at
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.schedule = schedule
+        self.in_flight = in_flight
+        self.lease_seconds = lease_seconds
+
+    async def _kick(self) -> None:
+        # the periodic drain picks the rows up anyway, so a broker hiccup only delays them
+        try:
+            await asyncio.to_thread(self.schedule)
+        except Exception as e:
+            logger.warning(f"Could not schedule the {self.name} drain: {str(e)}")
+
+    def kick_after_commit(self, db: AsyncSession) -> None:
+        on_commit(db, self._kick)
+
+    def _due(self, limit: int, *criteria: Any, order_by: Optional[Sequence[Any]] = None):
+        model = self.model
+        return (
+            select(model)
+            .where(model.next_attempt_at <= func.now(), *criteria)
+            .order_by(*(order_by or (model.next_attempt_at,)))
+            .limit(limit)
+            .with_for_update(skip_locked=True, of=model)
+        )
+
+    async def claim(self, db: AsyncSession, limit: int, *criteria: Any, order_by: Optional[Sequence[Any]] = None) -> List[Any]:
+        # the rows stay locked until the caller commits, so the work has to happen in this transaction
+        res = await db.execute(self._due(limit, self.model.status == self.pending, *criteria, order_by=order_by))
+        return list(res.scalars().all())
+
+    async def lease(self, db: AsyncSession, limit: int) -> List[Any]:
+        # marks the rows in flight so the caller can commit before the slow part; rows left in flight
+        # by a worker that died become due again once lease_seconds have passed
+        model = self.model
+        due = self._due(limit, or_(model.status == self.pending, model.status == self.in_flight)).with_only_columns(model.id)
+        res = await db.execute(
+            update(model)
+            .where(model.id.in_(due.scalar_subquery()))
+            .values(status=self.in_flight, next_attempt_at=func.now() + timedelta(seconds=self.lease_seconds))
+            .returning(model)
+        )
+        return list(res.scalars().all())
+
+    async def mark_done(self, db: AsyncSession, ids: List[UUID]) -> None:
+        if not ids:
+            return
+        await db.execute(
+            update(self.model)
+            .where(self.model.id.in_(ids))
+            .values(status=self.done, last_error=None, **{self.done_at: func.now()})
+        )
+
+    async def mark_failed(self, db: AsyncSession, ids: List[UUID], error: str) -> None:
+        if not ids:
+            return
+        model = self.model
+        attempts = model.attempts + 1
+        await db.execute(
+            update(model)
+            .where(model.id.in_(ids))
+            .values(
+                attempts=attempts,
+                last_error=error[:2000],
+                status=case(
+                    (attempts >= self.max_attempts, literal(self.failed, model.status.type)),
+                    else_=literal(self.pending, model.status.type),
+                ),
+                # exponential backoff: base, 2 * base, 4 * base, ...
+                next_attempt_at=func.now() + timedelta(seconds=self.retry_base_seconds) * func.power(2, model.attempts),
+            )
+        )
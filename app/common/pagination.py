@@ -0,0 +1,80 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Any, Generic, List, Optional, Sequence, Tuple, TypeVar
+from uuid import UUID
+
+from pydantic import BaseModel
+from sqlalchemy import Select, literal, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+T = TypeVar("T")
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class Page(BaseModel, Generic[T]):
+	items: List[T]
+	next_cursor: Optional[str] = None
+
+
+# workers import the paginated CRUD helpers too, so this module stays free of fastapi
+class InvalidCursor(ValueError):
+	pass
+
+
+class PageParams(BaseModel):
+	limit: int = DEFAULT_PAGE_SIZE
+	cursor: Optional[str] = None
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+	raw = json.dumps(list(values), default=str, separators=(",", ":"))
+	return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _coerce(column, value: Any) -> Any:
+	python_type = column.type.python_type
+	if python_type is datetime:
+		return datetime.fromisoformat(value)
+	if python_type is date:
+		return date.fromisoformat(value)
+	if python_type is UUID:
+		return UUID(value)
+	return python_type(value)
+
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> List[Any]:
+	try:
+		raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+		values = json.loads(raw)
+		if not isinstance(values, list) or len(values) != len(columns):
+			raise ValueError("cursor shape mismatch")
+		return [_coerce(column, value) for column, value in zip(columns, values)]
+	except (binascii.Error, ValueError, TypeError, UnicodeDecodeError):
+		raise InvalidCursor("Invalid cursor")
+
+
+async def paginate(
+	db: AsyncSession,
+	query: Select,
+	order_by: Sequence[Any],
+	params: PageParams,
+) -> Tuple[List[Any], Optional[str]]:
+	query = query.order_by(*order_by).limit(params.limit + 1)
+	if params.cursor:
+		values = decode_cursor(params.cursor, order_by)
+		query = query.where(
+			tuple_(*order_by) > tuple_(*(literal(value, column.type) for column, value in zip(order_by, values)))
+		)
+
+	res = await db.execute(query)
+	rows = res.scalars().all()
+	if len(rows) <= params.limit:
+		return rows, None
+
+	rows = rows[:params.limit]
+	return rows, encode_cursor([getattr(rows[-1], column.key) for column in order_by])
@@ -9,23 +9,67 @@ class Settings(BaseSettings):
     backend_url : str = ""
 
     database_url : str = ""
+    db_pool_profile : str = "direct"
+    db_pool_size : int = 5
+    db_max_overflow : int = 5
+    db_pool_timeout_seconds : float = 30
+    db_pool_recycle_seconds : int = 1800
+    db_pool_pre_ping : bool = True
+    db_statement_cache_size : int = 100
 
     secret_key : str = ""
     algorithm : str = "HS256"
     access_token_expire_minutes : int = 60
     password_reset_expire_minutes : int = 60
+    password_hash_time_cost : int = 3
+    password_hash_memory_cost : int = 65536
+    password_hash_parallelism : int = 4
+    password_hash_workers : int = 2
+    principal_cache_ttl_seconds : int = 300
+    principal_cache_local_ttl_seconds : int = 30
+    principal_cache_local_maxsize : int = 10000
+    verified_token_cache_enabled : bool = True
+    verified_token_cache_maxsize : int = 10000
 
     google_client_id : str = ""
     google_client_secret : str = ""
     google_redirect_uri : str = ""
+    google_certs_default_max_age_seconds : int = 3600
+    google_certs_refresh_margin_seconds : int = 300
+    google_certs_min_refresh_interval_seconds : int = 60
+    google_token_clock_skew_seconds : int = 10
 
     resend_api_key : str = ""
     resend_from_address : str = "delivered@resend.dev"
+    email_batch_size : int = 100
+    email_max_attempts : int = 6
+    email_retry_base_seconds : int = 30
+    email_send_lease_seconds : int = 300
+    email_drain_interval_seconds : int = 30
 
     gemini_api_key : str = ""
     ai_model : str = "gemini-1.5-flash"
-    
+    ai_report_model : str = "gemini-1.5-flash-8b"
+    ai_request_timeout_seconds : float = 60
+    ai_max_in_flight : int = 32
+    ai_max_connections : int = 64
+    ai_max_output_tokens : int = 8192
+    ai_output_tokens_per_task : int = 600
+    ai_batch_size : int = 12
+    ai_cache_enabled : bool = True
+    ai_cache_ttl_seconds : int = 60 * 60 * 24
+    ai_cache_local_maxsize : int = 1024
+    ai_cache_redis_max_entries : int = 50000
+
+    task_fanout_concurrency : int = 20
+    task_fanout_progress_every : int = 50
+    sweep_shards : int = 16
+    active_goal_chunk_size : int = 1000
+
     redis_url : str = ""
+    rate_limit_enabled : bool = True
+    rate_limit_local_maxsize : int = 10000
+    rate_limit_trusted_proxies : str = ""
 
     stripe_secret_key: str = ""
     stripe_publishable_key: str = ""
@@ -33,6 +77,11 @@ class Settings(BaseSettings):
     stripe_plan_id: str = ""
     stripe_success_url: str = "http://127.0.0.1:3000/dashboard/overview"
     stripe_cancel_url: str = "http://127.0.0.1:3000/dashboard/overview"
+    stripe_event_batch_size: int = 100
+    stripe_event_max_attempts: int = 8
+    stripe_event_retry_base_seconds: int = 30
+    stripe_event_drain_interval_seconds: int = 60
+    stripe_event_coalesce_seconds: int = 5
 
     class Config:
         env_file = ".env"
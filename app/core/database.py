@@ -1,11 +1,47 @@
-from typing import AsyncGenerator
-from sqlalchemy import create_engine
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from functools import lru_cache
+from typing import Any, AsyncGenerator, Awaitable, Callable, Dict, Optional
+from uuid import uuid4
+
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import NullPool
 
 from app.core.config import settings
 
-engine = create_async_engine(settings.database_url, echo=False, future=True)
+
+def _pool_options(profile: str) -> Dict[str, Any]:
+	if profile == "pgbouncer":
+		# PgBouncer in transaction mode owns the pooling and may hand every transaction a different
+		# server connection, so keep no local pool and never reuse a named prepared statement.
+		return {
+			"poolclass": NullPool,
+			"connect_args": {
+				"statement_cache_size": 0,
+				"prepared_statement_cache_size": 0,
+				"prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+			},
+		}
+	if profile == "direct":
+		return {
+			"pool_size": settings.db_pool_size,
+			"max_overflow": settings.db_max_overflow,
+			"pool_timeout": settings.db_pool_timeout_seconds,
+			"pool_recycle": settings.db_pool_recycle_seconds,
+			"pool_pre_ping": settings.db_pool_pre_ping,
+			"connect_args": {
+				"statement_cache_size": settings.db_statement_cache_size,
+				"prepared_statement_cache_size": settings.db_statement_cache_size,
+			},
+		}
+	raise ValueError(f"Unknown db_pool_profile: {profile}")
+
+
+def make_async_engine() -> AsyncEngine:
+	return create_async_engine(settings.database_url, echo=False, future=True, **_pool_options(settings.db_pool_profile))
+
+
+engine = make_async_engine()
 
 AsyncSessionLocal = sessionmaker(
     bind=engine,
@@ -17,6 +53,17 @@ AsyncSessionLocal = sessionmaker(
 
 Base = declarative_base()
 
+def on_commit(db: AsyncSession, callback: Callable[[], Awaitable[None]]) -> None:
+	db.info.setdefault("on_commit", []).append(callback)
+
+
+async def commit(db: AsyncSession) -> None:
+	# CRUD helpers only stage their writes; the route or job that owns the session commits once
+	await db.commit()
+	for callback in db.info.pop("on_commit", []):
+		await callback()
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
 	db = AsyncSessionLocal()
 	try:
@@ -24,6 +71,26 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
 	finally:
 		await db.close()
 
+
+def pool_stats(async_engine: Optional[AsyncEngine] = None) -> Dict[str, Any]:
+	async_engine = async_engine or AsyncSessionLocal.kw["bind"]
+	pool = async_engine.pool
+	stats = {"profile": settings.db_pool_profile, "pool": type(pool).__name__, "status": pool.status()}
+	if hasattr(pool, "checkedout"):
+		stats.update(
+			size=pool.size(),
+			checked_in=pool.checkedin(),
+			checked_out=pool.checkedout(),
+			overflow=pool.overflow(),
+			max_overflow=settings.db_max_overflow,
+		)
+	return stats
+
+
 SYNC_DATABASE_URL = settings.database_url.replace("asyncpg", "psycopg2")
-sync_engine = create_engine(SYNC_DATABASE_URL, future=True)
-SyncSessionLocal = sessionmaker(bind=sync_engine)
\ No newline at end of file
+
+
+@lru_cache(maxsize=1)
+def get_sync_engine() -> Engine:
+	# only migrations need the psycopg2 engine, so it is not created at import
+	return create_engine(SYNC_DATABASE_URL, future=True, pool_pre_ping=True)
\ No newline at end of file
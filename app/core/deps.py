@@ -1,39 +1,59 @@
-from fastapi import Depends, HTTPException
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Query
 from fastapi.security import OAuth2PasswordBearer
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
+from app.common.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, PageParams
 from app.core.security import decode_token
+from app.core.principal import Principal, load_principal
 from app.app_users.models import User
-from app.app_users.crud import get_user_by_email
-from app.app_subscriptions.crud import get_user_subscription
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login")
 
-async def get_current_user(
+async def get_current_principal(
 	token: str = Depends(oauth2_scheme),
 	db: AsyncSession = Depends(get_db)
-) -> User:
+) -> Principal:
 	email = decode_token(token)
 	if not email:
 		raise HTTPException(status_code=401, detail="Invalid token")
-	user = await get_user_by_email(db, email)
-	if not user:
+	principal = await load_principal(db, email)
+	if not principal:
 		raise HTTPException(status_code=401, detail="User not found")
-	return user
+	return principal
+
+
+async def get_current_user(
+	principal: Principal = Depends(get_current_principal)
+) -> User:
+	return principal.user
+
+
+async def get_current_admin(
+	principal: Principal = Depends(get_current_principal)
+) -> User:
+	if not principal.user.is_admin:
+		raise HTTPException(status_code=403, detail="Admin access required")
+	return principal.user
 
 
 async def get_current_active_subscriber(
-	db: AsyncSession = Depends(get_db),
-	current_user: User = Depends(get_current_user)
+	principal: Principal = Depends(get_current_principal)
 ) -> User:
-	try:
-		await get_user_subscription(db, current_user.id)
-		return current_user
-	except Exception:
+	if not principal.is_subscriber:
 		raise HTTPException(
 			status_code=403, 
 			detail="Active subscription required to access this feature"
-		)
\ No newline at end of file
+		)
+	return principal.user
+
+
+def page_params(
+	limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+	cursor: Optional[str] = Query(None),
+) -> PageParams:
+	return PageParams(limit=limit, cursor=cursor)
@@ -0,0 +1,67 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Optional, Tuple
+
+from passlib.context import CryptContext
+
+from app.core.config import settings
+
+
+# argon2 costs tens of milliseconds of CPU per call, so hashing runs on a small process pool
+# instead of the event loop; password_hash_workers = 0 falls back to a thread.
+@lru_cache(maxsize=1)
+def _context() -> CryptContext:
+	return CryptContext(
+		schemes=["argon2"],
+		deprecated="auto",
+		argon2__time_cost=settings.password_hash_time_cost,
+		argon2__memory_cost=settings.password_hash_memory_cost,
+		argon2__parallelism=settings.password_hash_parallelism,
+	)
+
+
+def _hash(password: str) -> str:
+	return _context().hash(password)
+
+
+def _verify_and_update(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+	return _context().verify_and_update(password, hashed_password)
+
+
+@lru_cache(maxsize=1)
+def _executor() -> Optional[ProcessPoolExecutor]:
+	if settings.password_hash_workers <= 0:
+		return None
+	# spawn, not fork: the API process runs an event loop and driver threads
+	return ProcessPoolExecutor(max_workers=settings.password_hash_workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+async def _run(fn: Callable[..., Any], *args: Any) -> Any:
+	executor = _executor()
+	if executor is None:
+		return await asyncio.to_thread(fn, *args)
+	return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+
+
+async def hash_password(password: str) -> str:
+	return await _run(_hash, password)
+
+
+async def verify_password(password: str, hashed_password: str) -> bool:
+	valid, _ = await verify_and_update_password(password, hashed_password)
+	return valid
+
+
+async def verify_and_update_password(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+	# the new hash is set when the stored one was made with other cost parameters
+	return await _run(_verify_and_update, password, hashed_password)
+
+
+def shutdown() -> None:
+	if _executor.cache_info().currsize:
+		executor = _executor()
+		if executor is not None:
+			executor.shutdown(wait=False, cancel_futures=True)
+		_executor.cache_clear()
@@ -0,0 +1,114 @@
+import json
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.config import settings
+from app.core.database import on_commit
+from app.lib.cache import TwoTierCache
+from app.app_users.models import AuthProvider, User
+from app.app_subscriptions.models import StripeSubscription, SubscriptionStatus
+
+
+ENTITLED_STATUSES = (SubscriptionStatus.active, SubscriptionStatus.trialing)
+
+principal_cache = TwoTierCache(
+	namespace="auth:principal",
+	ttl=settings.principal_cache_ttl_seconds,
+	local_maxsize=settings.principal_cache_local_maxsize,
+	local_ttl=settings.principal_cache_local_ttl_seconds,
+	broadcast=True,
+)
+
+
+@dataclass
+class Principal:
+	user: User
+	entitled: bool
+	entitled_until: Optional[datetime] = None
+
+	@property
+	def is_subscriber(self) -> bool:
+		if not self.entitled:
+			return False
+		return self.entitled_until is None or self.entitled_until > datetime.now(timezone.utc)
+
+
+def _dump(principal: Principal) -> str:
+	user = principal.user
+	return json.dumps({
+		"id": str(user.id),
+		"email": user.email,
+		"is_admin": user.is_admin,
+		"is_active": user.is_active,
+		"provider": user.provider.value if user.provider else None,
+		"provider_id": user.provider_id,
+		"created_at": user.created_at.isoformat(),
+		"updated_at": user.updated_at.isoformat(),
+		"entitled": principal.entitled,
+		"entitled_until": principal.entitled_until.isoformat() if principal.entitled_until else None,
+	})
+
+
+def _load(raw: str) -> Principal:
+	data = json.loads(raw)
+	user = User(
+		id=UUID(data["id"]),
+		email=data["email"],
+		is_admin=data["is_admin"],
+		is_active=data["is_active"],
+		provider=AuthProvider(data["provider"]) if data["provider"] else None,
+		provider_id=data["provider_id"],
+		created_at=datetime.fromisoformat(data["created_at"]),
+		updated_at=datetime.fromisoformat(data["updated_at"]),
+	)
+	# a detached instance can be re-attached with db.add() for updates such as soft_delete_user
+	make_transient_to_detached(user)
+	return Principal(
+		user=user,
+		entitled=data["entitled"],
+		entitled_until=datetime.fromisoformat(data["entitled_until"]) if data["entitled_until"] else None,
+	)
+
+
+async def load_principal(db: AsyncSession, email: str) -> Optional[Principal]:
+	cached = await principal_cache.get(email)
+	if cached is not None:
+		return _load(cached)
+
+	users = await db.execute(select(User).where(User.email == email, User.is_active == True))
+	user = users.scalars().first()
+	if not user:
+		return None
+
+	subscriptions = await db.execute(
+		select(StripeSubscription.status, StripeSubscription.current_period_end)
+		.where(StripeSubscription.user_id == user.id)
+		.order_by(StripeSubscription.created_at.desc())
+		.limit(1)
+	)
+	subscription = subscriptions.first()
+	principal = Principal(
+		user=user,
+		entitled=bool(subscription) and subscription.status in ENTITLED_STATUSES,
+		entitled_until=subscription.current_period_end if subscription else None,
+	)
+	await principal_cache.set(email, _dump(principal))
+	return principal
+
+
+async def invalidate_principal(email: str) -> None:
+	await principal_cache.delete(email)
+
+
+async def invalidate_principal_on_commit(db: AsyncSession, user_id: UUID) -> None:
+	# resolve the email inside the caller's transaction; the cache is only cleared once it commits
+	emails = await db.execute(select(User.email).where(User.id == user_id))
+	email = emails.scalars().first()
+	if email:
+		on_commit(db, lambda: invalidate_principal(email))
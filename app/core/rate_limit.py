@@ -0,0 +1,145 @@
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+from cachetools import TTLCache
+from fastapi import HTTPException, Request, status
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.security import decode_token
+from app.lib.redis_client import get_redis
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RatePolicy:
+	name: str
+	times: int
+	seconds: int
+	max_lease: int = 16
+
+
+POLICIES: Dict[str, RatePolicy] = {
+	policy.name: policy
+	for policy in (
+		RatePolicy("auth", times=10, seconds=60, max_lease=2),
+		RatePolicy("read", times=120, seconds=60),
+		RatePolicy("write", times=30, seconds=60, max_lease=8),
+		RatePolicy("billing", times=10, seconds=60, max_lease=2),
+	)
+}
+
+# Grants up to ARGV[2] tokens out of the window's remaining quota and returns {granted, pttl}.
+LEASE_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local wanted = tonumber(ARGV[2])
+local used = tonumber(redis.call('GET', KEYS[1]) or '0')
+local granted = math.min(wanted, limit - used)
+if granted <= 0 then
+	return {0, redis.call('PTTL', KEYS[1])}
+end
+if redis.call('INCRBY', KEYS[1], granted) == granted then
+	redis.call('PEXPIRE', KEYS[1], ARGV[3])
+end
+return {granted, redis.call('PTTL', KEYS[1])}
+"""
+
+
+class _Bucket:
+	__slots__ = ("tokens", "expires_at", "next_lease")
+
+	def __init__(self):
+		self.tokens = 0
+		self.expires_at = 0.0
+		self.next_lease = 1
+
+
+_buckets: "TTLCache[Tuple[str, str, str], _Bucket]" = TTLCache(
+	maxsize=settings.rate_limit_local_maxsize,
+	ttl=max(policy.seconds for policy in POLICIES.values()),
+)
+
+# X-Forwarded-For is only believed when the connection comes from one of these proxies
+_trusted_proxies = frozenset(ip.strip() for ip in settings.rate_limit_trusted_proxies.split(",") if ip.strip())
+
+
+def _identity(request: Request) -> str:
+	authorization = request.headers.get("Authorization", "")
+	scheme, _, token = authorization.partition(" ")
+	if scheme.lower() == "bearer" and token:
+		subject = decode_token(token)
+		if subject:
+			return f"user:{subject}"
+	return f"ip:{_client_ip(request)}"
+
+
+def _client_ip(request: Request) -> str:
+	ip = request.client.host if request.client else "unknown"
+	forwarded = request.headers.get("X-Forwarded-For")
+	if forwarded and ip in _trusted_proxies:
+		# walk back from the nearest hop; anything left of the first untrusted hop is client-supplied
+		for hop in reversed([hop.strip() for hop in forwarded.split(",")]):
+			ip = hop
+			if hop not in _trusted_proxies:
+				break
+	return ip
+
+
+def _route(request: Request) -> str:
+	route = request.scope.get("route")
+	return f"{request.method}:{getattr(route, 'path', request.url.path)}"
+
+
+async def _lease(policy: RatePolicy, route: str, identity: str, wanted: int) -> Tuple[int, int]:
+	redis = get_redis()
+	script = redis.register_script(LEASE_SCRIPT)
+	granted, pttl = await script(
+		keys=[f"ratelimit:{policy.name}:{route}:{identity}"],
+		args=[policy.times, wanted, policy.seconds * 1000],
+	)
+	return int(granted), int(pttl)
+
+
+# Per-process token bucket leasing quota from a shared Redis window. Leases double up to the
+# policy's max_lease while a caller keeps spending, so steady traffic costs one Redis call per
+# block and a caller with a handful of requests never strands much quota in one process.
+class RateLimit:
+	def __init__(self, policy: str):
+		self.policy = POLICIES[policy]
+
+	async def __call__(self, request: Request) -> None:
+		if not settings.rate_limit_enabled:
+			return
+
+		route = _route(request)
+		identity = _identity(request)
+		key = (self.policy.name, route, identity)
+		bucket = _buckets.get(key)
+		now = time.monotonic()
+		if bucket is None or bucket.expires_at <= now:
+			bucket = _buckets[key] = _Bucket()
+
+		if bucket.tokens <= 0:
+			wanted = min(bucket.next_lease, self.policy.max_lease)
+			try:
+				granted, pttl = await _lease(self.policy, route, identity, wanted)
+			except RedisError as e:
+				logger.warning(f"Rate limit lease failed for {self.policy.name}, allowing request: {str(e)}")
+				return
+			if pttl > 0:
+				bucket.expires_at = now + pttl / 1000
+			if granted <= 0:
+				raise HTTPException(
+					status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+					detail="Too Many Requests",
+					headers={"Retry-After": str(max(1, math.ceil(pttl / 1000)))},
+				)
+			bucket.tokens = granted
+			bucket.next_lease = wanted * 2
+
+		bucket.tokens -= 1
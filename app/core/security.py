@@ -1,20 +1,19 @@
+import hashlib
+import time
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Optional, Tuple
 
+from cachetools import LRUCache
 from jose import jwt, JWTError
-from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.lib import invalidation
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
 
+VERIFIED_TOKENS_NAMESPACE = "auth:verified_tokens"
 
-def hash_password(password: str) -> str:
-	return pwd_context.hash(password)
-
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-	return pwd_context.verify(plain_password, hashed_password)
+# token digest -> (subject, exp); lets a token reused for its whole lifetime skip signature checks
+_verified_tokens: "LRUCache[bytes, Tuple[str, float]]" = LRUCache(maxsize=settings.verified_token_cache_maxsize)
 
 
 def create_access_token(subject: str, expires_minutes: Optional[int] = None) -> str:
@@ -24,10 +23,38 @@ def create_access_token(subject: str, expires_minutes: Optional[int] = None) ->
 	return jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
 
 
+def _token_digest(token: str) -> bytes:
+	return hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+
+
 def decode_token(token: str) -> Optional[str]:
+	key = _token_digest(token)
+	cached = _verified_tokens.get(key)
+	if cached is not None:
+		subject, expires_at = cached
+		if expires_at > time.time():
+			return subject
+		_verified_tokens.pop(key, None)
+
 	try:
 		payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-		subject: str = payload.get("sub")
-		return subject
 	except JWTError:
-		return None
\ No newline at end of file
+		return None
+	subject: str = payload.get("sub")
+	expires_at = payload.get("exp")
+	if settings.verified_token_cache_enabled and subject and isinstance(expires_at, (int, float)):
+		_verified_tokens[key] = (subject, float(expires_at))
+	return subject
+
+
+def purge_verified_tokens(subject: str) -> None:
+	for key in [key for key, (cached_subject, _) in _verified_tokens.items() if cached_subject == subject]:
+		_verified_tokens.pop(key, None)
+
+
+async def forget_verified_tokens(subject: str) -> None:
+	purge_verified_tokens(subject)
+	await invalidation.publish(VERIFIED_TOKENS_NAMESPACE, subject)
+
+
+invalidation.subscribe(VERIFIED_TOKENS_NAMESPACE, purge_verified_tokens, _verified_tokens.clear)
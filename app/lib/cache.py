@@ -0,0 +1,118 @@
+import hashlib
+import logging
+import time
+from typing import Dict, Optional
+
+from cachetools import TTLCache
+from redis.exceptions import RedisError
+
+from app.lib import invalidation
+from app.lib.redis_client import get_redis
+
+
+logger = logging.getLogger(__name__)
+
+
+def content_key(*parts: str) -> str:
+	digest = hashlib.sha256()
+	for part in parts:
+		digest.update(part.encode("utf-8"))
+		digest.update(b"\0")
+	return digest.hexdigest()
+
+
+class TwoTierCache:
+	def __init__(
+		self,
+		namespace: str,
+		ttl: int,
+		local_maxsize: int,
+		redis_max_entries: Optional[int] = None,
+		local_ttl: Optional[int] = None,
+		broadcast: bool = False,
+	):
+		self.namespace = namespace
+		self.ttl = ttl
+		self.redis_max_entries = redis_max_entries
+		self._local: TTLCache = TTLCache(maxsize=local_maxsize, ttl=local_ttl or ttl)
+		self._stats: Dict[str, int] = {"local_hits": 0, "redis_hits": 0, "misses": 0, "evictions": 0}
+		# with broadcast, delete() also drops the key from every other process' local tier
+		self.broadcast = broadcast
+		if broadcast:
+			invalidation.subscribe(namespace, self.forget_local, self._local.clear)
+
+	def _redis_key(self, key: str) -> str:
+		return f"{self.namespace}:{key}"
+
+	@property
+	def _index_key(self) -> str:
+		return f"{self.namespace}:__index__"
+
+	@property
+	def stats(self) -> Dict[str, int]:
+		return dict(self._stats, local_size=len(self._local))
+
+	async def get(self, key: str) -> Optional[str]:
+		value = self._local.get(key)
+		if value is not None:
+			self._stats["local_hits"] += 1
+			return value
+
+		try:
+			value = await get_redis().get(self._redis_key(key))
+		except (RedisError, ValueError) as e:
+			logger.warning(f"Cache {self.namespace} read failed: {str(e)}")
+			value = None
+
+		if value is None:
+			self._stats["misses"] += 1
+			return None
+
+		self._stats["redis_hits"] += 1
+		self._local[key] = value
+		return value
+
+	async def set(self, key: str, value: str) -> None:
+		self._local[key] = value
+		try:
+			redis = get_redis()
+			now = time.time()
+			async with redis.pipeline(transaction=False) as pipe:
+				pipe.set(self._redis_key(key), value, ex=self.ttl)
+				if self.redis_max_entries:
+					pipe.zadd(self._index_key, {key: now})
+					pipe.zremrangebyscore(self._index_key, "-inf", now - self.ttl)
+					pipe.zcard(self._index_key)
+				results = await pipe.execute()
+
+			if self.redis_max_entries and results[-1] > self.redis_max_entries:
+				await self._evict(results[-1] - self.redis_max_entries)
+		except (RedisError, ValueError) as e:
+			logger.warning(f"Cache {self.namespace} write failed: {str(e)}")
+
+	async def _evict(self, count: int) -> None:
+		redis = get_redis()
+		oldest = await redis.zrange(self._index_key, 0, count - 1)
+		if not oldest:
+			return
+		async with redis.pipeline(transaction=False) as pipe:
+			pipe.delete(*(self._redis_key(key) for key in oldest))
+			pipe.zrem(self._index_key, *oldest)
+			await pipe.execute()
+		self._stats["evictions"] += len(oldest)
+
+	def forget_local(self, key: str) -> None:
+		self._local.pop(key, None)
+
+	async def delete(self, key: str) -> None:
+		self.forget_local(key)
+		try:
+			async with get_redis().pipeline(transaction=False) as pipe:
+				pipe.delete(self._redis_key(key))
+				if self.redis_max_entries:
+					pipe.zrem(self._index_key, key)
+				await pipe.execute()
+		except (RedisError, ValueError) as e:
+			logger.warning(f"Cache {self.namespace} delete failed: {str(e)}")
+		if self.broadcast:
+			await invalidation.publish(self.namespace, key)
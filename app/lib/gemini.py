@@ -0,0 +1,140 @@
+import asyncio
+import json
+import weakref
+from typing import TYPE_CHECKING, Any, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.lib.cache import TwoTierCache, content_key
+
+if TYPE_CHECKING:
+	from google import genai
+
+
+class GeminiError(Exception):
+	pass
+
+
+class GeminiTruncatedError(GeminiError):
+	pass
+
+
+# httpx.AsyncClient and asyncio.Semaphore are bound to the loop they were first used on,
+# so each event loop gets its own pooled client and in-flight limit.
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, genai.Client]" = weakref.WeakKeyDictionary()
+_http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+response_cache = TwoTierCache(
+	namespace="ai:response",
+	ttl=settings.ai_cache_ttl_seconds,
+	local_maxsize=settings.ai_cache_local_maxsize,
+	redis_max_entries=settings.ai_cache_redis_max_entries,
+)
+
+
+def _build_client(http_client: httpx.AsyncClient) -> "genai.Client":
+	# google.genai takes about half a second to import, so it is only loaded by the first request
+	from google import genai
+	from google.genai import types
+
+	return genai.Client(
+		api_key=settings.gemini_api_key,
+		http_options=types.HttpOptions(
+			timeout=int(settings.ai_request_timeout_seconds * 1000),
+			httpx_async_client=http_client,
+		),
+	)
+
+
+def get_client() -> "genai.Client":
+	loop = asyncio.get_running_loop()
+	client = _clients.get(loop)
+	if client is None:
+		http_client = _http_clients[loop] = httpx.AsyncClient(
+			limits=httpx.Limits(
+				max_connections=settings.ai_max_connections,
+				max_keepalive_connections=settings.ai_max_connections,
+			),
+			timeout=settings.ai_request_timeout_seconds,
+		)
+		client = _clients[loop] = _build_client(http_client)
+	return client
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+	loop = asyncio.get_running_loop()
+	semaphore = _semaphores.get(loop)
+	if semaphore is None:
+		semaphore = _semaphores[loop] = asyncio.Semaphore(settings.ai_max_in_flight)
+	return semaphore
+
+
+async def generate(
+	system: str,
+	user: str,
+	model: Optional[str] = None,
+	timeout: Optional[float] = None,
+	max_retries: int = 3,
+	retry_delay: float = 2,
+	json_mode: bool = False,
+	max_output_tokens: Optional[int] = None,
+) -> str:
+	from google.genai import types
+	from google.genai.errors import APIError, ServerError
+
+	contents = [{"role": "user", "parts": [{"text": f"{system}\n\nUser: {user}"}]}]
+	timeout = timeout or settings.ai_request_timeout_seconds
+	config = types.GenerateContentConfig(
+		response_mime_type="application/json" if json_mode else None,
+		max_output_tokens=max_output_tokens or settings.ai_max_output_tokens,
+	)
+
+	for attempt in range(max_retries):
+		try:
+			async with _get_semaphore():
+				resp = await asyncio.wait_for(
+					get_client().aio.models.generate_content(model=model or settings.ai_model, contents=contents, config=config),
+					timeout=timeout,
+				)
+		except (ServerError, httpx.HTTPError, asyncio.TimeoutError) as e:
+			# google-genai passes httpx transport errors (ReadTimeout, ConnectError, ...) through unwrapped
+			if attempt < max_retries - 1:
+				await asyncio.sleep(retry_delay * (attempt + 1))
+				continue
+			if isinstance(e, asyncio.TimeoutError):
+				raise
+			raise GeminiError(f"{type(e).__name__}: {str(e)}") from e
+		except APIError as e:
+			raise GeminiError(str(e)) from e
+
+		candidates = resp.candidates or []
+		if candidates and candidates[0].finish_reason == types.FinishReason.MAX_TOKENS:
+			raise GeminiTruncatedError(f"Response truncated at {config.max_output_tokens} output tokens")
+		if resp.text is None:
+			raise GeminiError("Empty response")
+		return resp.text
+
+
+async def generate_json(system: str, user: str, cache: bool = True, **kwargs) -> Any:
+	cache = cache and settings.ai_cache_enabled
+	key = content_key(kwargs.get("model") or settings.ai_model, system, user)
+	if cache:
+		cached = await response_cache.get(key)
+		if cached is not None:
+			return json.loads(cached)
+
+	text = await generate(system, user, json_mode=True, **kwargs)
+	data = json.loads(text)
+	if cache and not (isinstance(data, dict) and data.get("error")):
+		await response_cache.set(key, text)
+	return data
+
+
+async def aclose() -> None:
+	loop = asyncio.get_running_loop()
+	_clients.pop(loop, None)
+	http_client = _http_clients.pop(loop, None)
+	if http_client is not None:
+		await http_client.aclose()
@@ -0,0 +1,167 @@
+import asyncio
+import base64
+import json
+import logging
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.lib.redis_client import get_redis
+
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_CERTS_URL = "https://www.googleapis.com/oauth2/v1/certs"
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+MAX_AGE = re.compile(r"max-age=(\d+)")
+
+# returns ({kid: PEM certificate}, max-age seconds)
+Fetcher = Callable[[], Tuple[Dict[str, str], int]]
+
+
+class GoogleTokenError(Exception):
+	pass
+
+
+@dataclass
+class KeySet:
+	certs: Dict[str, str]
+	expires_at: float
+
+	def expires_in(self) -> float:
+		return self.expires_at - time.time()
+
+
+def _max_age(headers: Mapping[str, str]) -> int:
+	match = MAX_AGE.search(headers.get("cache-control") or headers.get("Cache-Control") or "")
+	return int(match.group(1)) if match else settings.google_certs_default_max_age_seconds
+
+
+def fetch_google_certs() -> Tuple[Dict[str, str], int]:
+	from google.auth import exceptions
+	from google.auth.transport import requests as google_requests
+
+	try:
+		response = google_requests.Request()(GOOGLE_CERTS_URL, method="GET")
+	except exceptions.TransportError as e:
+		raise GoogleTokenError(f"Fetching Google certificates failed: {str(e)}")
+	if response.status != 200:
+		raise GoogleTokenError(f"Fetching Google certificates failed with status {response.status}")
+	return json.loads(response.data), _max_age(response.headers)
+
+
+def _token_kid(token: str) -> Optional[str]:
+	try:
+		header = token.split(".", 1)[0]
+		return json.loads(base64.urlsafe_b64decode(header + "=" * (-len(header) % 4))).get("kid")
+	except (ValueError, AttributeError):
+		return None
+
+
+# Google's signing certificates, kept in process and in Redis for as long as their Cache-Control
+# max-age allows. Shortly before they expire a background task refreshes them, so logins only
+# wait on Google when no worker has a usable copy.
+class GoogleKeySetCache:
+	def __init__(self, fetcher: Fetcher = fetch_google_certs, namespace: str = "google:certs"):
+		self.fetcher = fetcher
+		self.namespace = namespace
+		self._local: Optional[KeySet] = None
+		self._lock: Optional[asyncio.Lock] = None
+		self._refreshing: Optional[asyncio.Task] = None
+		self._last_forced = 0.0
+
+	def set(self, certs: Dict[str, str], max_age: int) -> KeySet:
+		self._local = KeySet(certs=dict(certs), expires_at=time.time() + max_age)
+		return self._local
+
+	async def get(self, force: bool = False) -> KeySet:
+		key_set = self._local
+		if not force and key_set is not None and key_set.expires_in() > 0:
+			if key_set.expires_in() < settings.google_certs_refresh_margin_seconds:
+				self._refresh_in_background()
+			return key_set
+
+		if self._lock is None:
+			self._lock = asyncio.Lock()
+		async with self._lock:
+			if not force and self._local is not None and self._local.expires_in() > 0:
+				return self._local
+			if not force:
+				key_set = await self._read_shared()
+				if key_set is not None:
+					self._local = key_set
+					return key_set
+			return await self._refresh()
+
+	async def refresh_for_unknown_kid(self) -> Optional[KeySet]:
+		# keys rotate ahead of max-age; allow one forced refresh per interval, not per bad token
+		if time.time() - self._last_forced < settings.google_certs_min_refresh_interval_seconds:
+			return None
+		self._last_forced = time.time()
+		return await self.get(force=True)
+
+	def _refresh_in_background(self) -> None:
+		if self._refreshing is None or self._refreshing.done():
+			self._refreshing = asyncio.create_task(self._refresh_quietly())
+
+	async def _refresh_quietly(self) -> None:
+		try:
+			await self._refresh()
+		except Exception as e:
+			logger.warning(f"Background refresh of Google certificates failed: {str(e)}")
+
+	async def _refresh(self) -> KeySet:
+		certs, max_age = await asyncio.to_thread(self.fetcher)
+		key_set = self.set(certs, max_age)
+		await self._write_shared(key_set, max_age)
+		return key_set
+
+	async def _read_shared(self) -> Optional[KeySet]:
+		try:
+			raw = await get_redis().get(self.namespace)
+		except (RedisError, ValueError) as e:
+			logger.warning(f"Reading Google certificates from Redis failed: {str(e)}")
+			return None
+		if not raw:
+			return None
+		data = json.loads(raw)
+		key_set = KeySet(certs=data["certs"], expires_at=data["expires_at"])
+		return key_set if key_set.expires_in() > 0 else None
+
+	async def _write_shared(self, key_set: KeySet, max_age: int) -> None:
+		try:
+			await get_redis().set(
+				self.namespace,
+				json.dumps({"certs": key_set.certs, "expires_at": key_set.expires_at}),
+				ex=max(1, max_age),
+			)
+		except (RedisError, ValueError) as e:
+			logger.warning(f"Writing Google certificates to Redis failed: {str(e)}")
+
+
+def _verify(token: str, certs: Dict[str, str], audience: str) -> Dict[str, Any]:
+	from google.auth import exceptions, jwt
+
+	try:
+		claims = jwt.decode(token, certs=certs, audience=audience, clock_skew_in_seconds=settings.google_token_clock_skew_seconds)
+	except (exceptions.GoogleAuthError, ValueError) as e:
+		raise GoogleTokenError(str(e))
+	if claims.get("iss") not in GOOGLE_ISSUERS:
+		raise GoogleTokenError(f"Wrong issuer: {claims.get('iss')}")
+	return claims
+
+
+google_key_set = GoogleKeySetCache()
+
+
+async def verify_google_id_token(token: str, audience: str, key_set_cache: GoogleKeySetCache = google_key_set) -> Dict[str, Any]:
+	key_set = await key_set_cache.get()
+	kid = _token_kid(token)
+	if kid and kid not in key_set.certs:
+		key_set = await key_set_cache.refresh_for_unknown_kid() or key_set
+	return await asyncio.to_thread(_verify, token, key_set.certs, audience)
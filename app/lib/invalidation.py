@@ -0,0 +1,79 @@
+import asyncio
+import logging
+from typing import Callable, Dict, Optional, Tuple
+
+from redis.exceptions import RedisError
+
+from app.lib.redis_client import get_redis
+
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "cache:invalidate"
+RECONNECT_DELAY_SECONDS = 1
+
+# namespace -> (forget one key, clear everything); process-local tiers register here so a change
+# made by any API worker or Celery job reaches the copies held by every other process
+_handlers: Dict[str, Tuple[Callable[[str], None], Callable[[], None]]] = {}
+_listener: Optional[asyncio.Task] = None
+
+
+def subscribe(namespace: str, forget: Callable[[str], None], clear: Callable[[], None]) -> None:
+	_handlers[namespace] = (forget, clear)
+
+
+async def publish(namespace: str, key: str) -> None:
+	try:
+		await get_redis().publish(CHANNEL, f"{namespace}\0{key}")
+	except (RedisError, ValueError) as e:
+		logger.warning(f"Publishing invalidation of {namespace} failed: {str(e)}")
+
+
+def _dispatch(message: str) -> None:
+	namespace, _, key = message.partition("\0")
+	handlers = _handlers.get(namespace)
+	if handlers:
+		handlers[0](key)
+
+
+def _clear_all() -> None:
+	for _, clear in _handlers.values():
+		clear()
+
+
+async def _listen() -> None:
+	missed = False
+	while True:
+		pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+		try:
+			await pubsub.subscribe(CHANNEL)
+			if missed:
+				# messages published while disconnected are gone, so nothing local can be trusted
+				_clear_all()
+				missed = False
+			async for message in pubsub.listen():
+				if message and message.get("type") == "message":
+					_dispatch(message["data"])
+		except (RedisError, OSError) as e:
+			logger.warning(f"Invalidation listener disconnected: {str(e)}")
+			missed = True
+			await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+		finally:
+			await pubsub.aclose()
+
+
+def start() -> None:
+	global _listener
+	if _listener is None or _listener.done():
+		_listener = asyncio.create_task(_listen())
+
+
+async def stop() -> None:
+	global _listener
+	if _listener is not None:
+		_listener.cancel()
+		try:
+			await _listener
+		except asyncio.CancelledError:
+			pass
+		_listener = None
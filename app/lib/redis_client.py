@@ -0,0 +1,24 @@
+import asyncio
+import weakref
+
+from redis.asyncio import Redis, from_url as redis_from_url
+
+from app.core.config import settings
+
+
+# redis.asyncio connection pools are bound to the loop they were created on.
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Redis]" = weakref.WeakKeyDictionary()
+
+
+def get_redis() -> Redis:
+	loop = asyncio.get_running_loop()
+	client = _clients.get(loop)
+	if client is None:
+		client = _clients[loop] = redis_from_url(settings.redis_url, encoding="utf-8", decode_responses=True)
+	return client
+
+
+async def aclose() -> None:
+	client = _clients.pop(asyncio.get_running_loop(), None)
+	if client is not None:
+		await client.aclose()
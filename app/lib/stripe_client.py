@@ -0,0 +1,11 @@
+from functools import lru_cache
+
+from app.core.config import settings
+
+
+@lru_cache(maxsize=1)
+def get_stripe():
+	import stripe
+
+	stripe.api_key = settings.stripe_secret_key
+	return stripe
@@ -1,11 +1,15 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi_limiter import FastAPILimiter
+from contextlib import asynccontextmanager
 
-from redis.asyncio import from_url as redis_from_url
-import stripe
+from fastapi import Depends, FastAPI, Request, status
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from app.core.config import settings
+from app.core import passwords
+from app.core.database import pool_stats
+from app.core.deps import get_current_admin
+from app.common.pagination import InvalidCursor
+from app.lib import invalidation
 from app.api.v1.routes_auth import router as auth_router
 from app.api.v1.routes_goals import router as goals_router
 from app.api.v1.routes_tasks import router as tasks_router
@@ -13,9 +17,15 @@ from app.api.v1.routes_reports import router as reports_router
 from app.api.v1.routes_subscriptions import router as subscriptions_router
 
 
-stripe.api_key = settings.stripe_secret_key
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+	invalidation.start()
+	yield
+	passwords.shutdown()
+	await invalidation.stop()
+
 
-app = FastAPI(title=settings.project_name, version=settings.version)
+app = FastAPI(title=settings.project_name, version=settings.version, lifespan=lifespan)
 
 
 app.add_middleware(
@@ -29,10 +39,14 @@ app.add_middleware(
 )
 
 
-@app.on_event("startup")
-async def startup():
-	redis = redis_from_url(settings.redis_url, encoding="utf-8", decode_responses=True)
-	await FastAPILimiter.init(redis)
+@app.exception_handler(InvalidCursor)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursor):
+	return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content={"detail": str(exc)})
+
+
+@app.get("/health/db-pool", include_in_schema=False, dependencies=[Depends(get_current_admin)])
+async def db_pool_health():
+	return pool_stats()
 
 
 app.include_router(auth_router, prefix="/api/v1/auth", tags=["auth"]) 
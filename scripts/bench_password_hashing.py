@@ -0,0 +1,83 @@
+"""Login throughput of one API worker with argon2 on the event loop vs on the hashing pool.
+
+Every simulated login verifies a password while a ticker coroutine measures how late the
+event loop wakes up; on the loop, that lag is what every other request on the worker waits.
+
+    python scripts/bench_password_hashing.py
+    python scripts/bench_password_hashing.py --logins 200 --concurrency 32 --workers 4
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+PASSWORD = "correct horse battery staple"
+
+
+async def _ticker(stop: asyncio.Event, lags: List[float], interval: float = 0.005) -> None:
+	loop = asyncio.get_running_loop()
+	while not stop.is_set():
+		expected = loop.time() + interval
+		await asyncio.sleep(interval)
+		lags.append(max(0.0, loop.time() - expected))
+
+
+async def _run(verify, hashed: str, logins: int, concurrency: int) -> Tuple[float, float]:
+	semaphore = asyncio.Semaphore(concurrency)
+	stop = asyncio.Event()
+	lags: List[float] = []
+	ticker = asyncio.create_task(_ticker(stop, lags))
+
+	async def login():
+		async with semaphore:
+			if not await verify(PASSWORD, hashed):
+				raise RuntimeError("verification failed")
+
+	started = time.perf_counter()
+	await asyncio.gather(*(login() for _ in range(logins)))
+	elapsed = time.perf_counter() - started
+	stop.set()
+	await ticker
+	return logins / elapsed, max(lags, default=0.0) * 1000
+
+
+async def main() -> int:
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument("--logins", type=int, default=100)
+	parser.add_argument("--concurrency", type=int, default=16)
+	parser.add_argument("--workers", type=int, default=None, help="overrides PASSWORD_HASH_WORKERS")
+	args = parser.parse_args()
+
+	if args.workers is not None:
+		os.environ["PASSWORD_HASH_WORKERS"] = str(args.workers)
+
+	from app.core import passwords
+	from app.core.config import settings
+
+	hashed = passwords._hash(PASSWORD)
+
+	async def inline(password: str, hashed_password: str) -> bool:
+		return passwords._verify_and_update(password, hashed_password)[0]
+
+	# warm the pool up so process start-up is not billed to the first logins
+	await asyncio.gather(*(passwords.verify_password(PASSWORD, hashed) for _ in range(max(1, settings.password_hash_workers))))
+
+	print(
+		f"argon2 time_cost={settings.password_hash_time_cost} memory_cost={settings.password_hash_memory_cost} "
+		f"parallelism={settings.password_hash_parallelism}, {args.logins} logins, concurrency {args.concurrency}"
+	)
+	for name, verify in (("event loop", inline), (f"pool ({settings.password_hash_workers} workers)", passwords.verify_password)):
+		throughput, lag = await _run(verify, hashed, args.logins, args.concurrency)
+		print(f"  {name:<22} {throughput:8.1f} logins/s   max loop lag {lag:8.1f} ms")
+
+	passwords.shutdown()
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(asyncio.run(main()))
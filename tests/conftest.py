@@ -0,0 +1,129 @@
+import os
+
+# settings are read at import time; the database tests run against TEST_DATABASE_URL only
+os.environ.setdefault("DATABASE_URL", os.getenv("TEST_DATABASE_URL") or "postgresql+asyncpg://localhost/vibezone_test")
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/15")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("GEMINI_API_KEY", "test")
+
+from datetime import date, datetime, timedelta, timezone
+from typing import List
+from uuid import uuid4
+
+import httpx
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.core.database import AsyncSessionLocal, Base, get_db
+from app.core.principal import invalidate_principal
+from app.core.rate_limit import RateLimit
+from app.core.security import create_access_token
+from app.app_users.models import User
+from app.app_goals.models import Goal, GoalStatus
+from app.app_tasks.models import Task, TaskStatus
+from app.app_subscriptions.models import StripeSubscription, SubscriptionStatus
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+	return "asyncio"
+
+
+class StatementCounter:
+	def __init__(self):
+		self.statements: List[str] = []
+
+	def __call__(self, conn, cursor, statement, parameters, context, executemany):
+		self.statements.append(statement)
+
+	@property
+	def count(self) -> int:
+		return len(self.statements)
+
+	def reset(self) -> None:
+		self.statements.clear()
+
+
+@pytest.fixture(scope="session")
+async def engine(anyio_backend):
+	url = os.getenv("TEST_DATABASE_URL")
+	if not url:
+		pytest.skip("TEST_DATABASE_URL is not set")
+	engine = create_async_engine(url)
+	async with engine.begin() as conn:
+		await conn.run_sync(Base.metadata.drop_all)
+		await conn.run_sync(Base.metadata.create_all)
+	yield engine
+	async with engine.begin() as conn:
+		await conn.run_sync(Base.metadata.drop_all)
+	await engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+	return sessionmaker(class_=AsyncSessionLocal.class_, **{**AsyncSessionLocal.kw, "bind": engine})
+
+
+@pytest.fixture
+def statements(engine):
+	counter = StatementCounter()
+	event.listen(engine.sync_engine, "after_cursor_execute", counter)
+	yield counter
+	event.remove(engine.sync_engine, "after_cursor_execute", counter)
+
+
+@pytest.fixture
+async def client(session_factory):
+	async def override_get_db():
+		async with session_factory() as db:
+			yield db
+
+	async def allow():
+		return None
+
+	app.dependency_overrides[get_db] = override_get_db
+	# rate limits talk to Redis, not to the database
+	for route in app.routes:
+		for dependency in getattr(route, "dependencies", []):
+			if isinstance(dependency.dependency, RateLimit):
+				app.dependency_overrides[dependency.dependency] = allow
+	async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+		yield client
+	app.dependency_overrides.clear()
+
+
+@pytest.fixture
+async def subscriber(session_factory):
+	email = f"{uuid4().hex}@example.com"
+	async with session_factory() as db:
+		user = User(email=email)
+		db.add(user)
+		await db.flush()
+		db.add(StripeSubscription(
+			user_id=user.id,
+			stripe_customer_id="cus_test",
+			plan_id="plan_test",
+			status=SubscriptionStatus.active,
+			current_period_end=datetime.now(timezone.utc) + timedelta(days=30),
+		))
+		goal = Goal(user_id=user.id, title="Run a marathon", start_date=date.today() - timedelta(days=5), target_days=30, status=GoalStatus.active)
+		db.add(goal)
+		await db.flush()
+		tasks = [
+			Task(goal_id=goal.id, title=f"Day {day}", assigned_date=goal.start_date + timedelta(days=day), status=TaskStatus.done if day < 5 else TaskStatus.assigned)
+			for day in range(6)
+		]
+		db.add_all(tasks)
+		await db.commit()
+
+	# every test starts from a cold principal cache so the counts do not depend on test order
+	await invalidate_principal(email)
+	return {
+		"email": email,
+		"goal_id": goal.id,
+		"assigned_task_id": tasks[-1].id,
+		"headers": {"Authorization": f"Bearer {create_access_token(subject=email)}"},
+	}
@@ -0,0 +1,34 @@
+import pytest
+from sqlalchemy import update
+
+from app.core.principal import invalidate_principal
+from app.app_users.models import User
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def admin(session_factory, subscriber):
+	async with session_factory() as db:
+		await db.execute(update(User).where(User.email == subscriber["email"]).values(is_admin=True))
+		await db.commit()
+	await invalidate_principal(subscriber["email"])
+	return subscriber
+
+
+async def test_db_pool_health_is_admin_only(client, subscriber):
+	assert (await client.get("/health/db-pool")).status_code == 401
+	assert (await client.get("/health/db-pool", headers=subscriber["headers"])).status_code == 403
+
+
+async def test_db_pool_health(client, admin):
+	res = await client.get("/health/db-pool", headers=admin["headers"])
+	assert res.status_code == 200
+	assert res.json()["profile"] == "direct"
+
+
+@pytest.mark.parametrize("method, path", [("POST", "/api/v1/tasks/create"), ("GET", "/api/v1/tasks/create/some-job")])
+async def test_daily_task_jobs_are_admin_only(client, subscriber, method, path):
+	assert (await client.request(method, path)).status_code == 401
+	assert (await client.request(method, path, headers=subscriber["headers"])).status_code == 403
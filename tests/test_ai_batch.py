@@ -0,0 +1,101 @@
+import asyncio
+import json
+from datetime import date
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.lib import gemini
+from app.app_tasks import ai
+
+
+class EmptyResult:
+	def all(self):
+		return []
+
+	def scalars(self):
+		return self
+
+
+class NoHistory:
+	async def execute(self, query):
+		return EmptyResult()
+
+
+def _goals(count):
+	return [SimpleNamespace(id=uuid4(), title=f"Goal {i}", description=None, start_date=date(2025, 3, 1), end_date=None, target_days=30) for i in range(count)]
+
+
+def _task(goal_id, **fields):
+	return {"goal_id": str(goal_id), "title": f"Task for {goal_id}", "description": "", "difficulty": "easy", "status": "assigned", **fields}
+
+
+class FakeModel:
+	def __init__(self, answer):
+		self.answer = answer
+		self.batches = []
+
+	async def __call__(self, system, user, **kwargs):
+		payload = json.loads(user)
+		goal_ids = [entry["goal_id"] for entry in payload["goals"]] if "goals" in payload else [None]
+		self.batches.append(goal_ids)
+		return self.answer(goal_ids)
+
+
+def test_batch_is_demultiplexed_by_goal_id(monkeypatch):
+	goals = _goals(3)
+	# out of order, one unknown goal and one duplicate; none of them may leak into another goal
+	model = FakeModel(lambda ids: {"tasks": [_task(ids[2]), _task(uuid4()), _task(ids[0]), _task(ids[1]), _task(ids[0], title="duplicate")]})
+	monkeypatch.setattr(gemini, "generate_json", model)
+
+	results = asyncio.run(ai.generate_next_tasks_batch(NoHistory(), goals))
+
+	assert model.batches == [[str(goal.id) for goal in goals]]
+	assert {goal_id: task["title"] for goal_id, task in results.items()} == {goal.id: f"Task for {goal.id}" for goal in goals}
+
+
+def test_missing_and_invalid_entries_fall_back_to_single_calls(monkeypatch):
+	goals = _goals(4)
+
+	def answer(ids):
+		if ids == [None]:
+			return _task(None, title="single")
+		return [_task(ids[0]), _task(ids[1], error="no idea"), _task(ids[2], difficulty="impossible")]
+
+	model = FakeModel(answer)
+	monkeypatch.setattr(gemini, "generate_json", model)
+
+	results = asyncio.run(ai.generate_next_tasks_batch(NoHistory(), goals))
+
+	assert len(model.batches) == 1 + 3
+	assert results[goals[0].id]["title"] == f"Task for {goals[0].id}"
+	assert [results[goal.id]["title"] for goal in goals[1:]] == ["single"] * 3
+
+
+def test_truncated_batch_is_split(monkeypatch):
+	monkeypatch.setattr(settings, "ai_output_tokens_per_task", settings.ai_max_output_tokens // 8)
+	goals = _goals(8)
+
+	def answer(ids):
+		if len(ids) > 2:
+			raise gemini.GeminiTruncatedError("MAX_TOKENS")
+		return {"tasks": [_task(goal_id) for goal_id in ids]}
+
+	model = FakeModel(answer)
+	monkeypatch.setattr(gemini, "generate_json", model)
+
+	results = asyncio.run(ai.generate_next_tasks_batch(NoHistory(), goals))
+
+	assert set(results) == {goal.id for goal in goals}
+	assert sorted(len(batch) for batch in model.batches) == [2, 2, 2, 2, 4, 4, 8]
+
+
+def test_single_goal_generation_is_validated(monkeypatch):
+	goal = _goals(1)[0]
+	monkeypatch.setattr(gemini, "generate_json", FakeModel(lambda ids: {"error": "no idea"}))
+
+	with pytest.raises(ValidationError):
+		asyncio.run(ai.generate_next_task(NoHistory(), goal))
@@ -0,0 +1,25 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import func, select
+
+from app.app_goals.models import GoalDailyStats
+from app.app_tasks.crud import create_task
+from app.app_tasks.models import Task, TaskStatus
+from app.app_tasks.schemas import TaskCreate
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_second_task_for_the_same_day_is_skipped(session_factory, subscriber):
+	goal_id = subscriber["goal_id"]
+	async with session_factory() as db:
+		task = await create_task(db, TaskCreate(goal_id=goal_id, title="Duplicate", assigned_date=date.today(), status=TaskStatus.assigned, ai_generated=True))
+		await db.commit()
+		assert task is None
+
+		today = await db.execute(select(Task.title).where(Task.goal_id == goal_id, Task.assigned_date == date.today()))
+		assert today.scalars().all() == ["Day 5"]
+		stats = await db.execute(select(func.count()).select_from(GoalDailyStats).where(GoalDailyStats.goal_id == goal_id))
+		assert stats.scalar_one() == 0
@@ -0,0 +1,68 @@
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import delete, select
+
+from app.app_emails import tasks
+from app.app_emails.crud import enqueue_email
+from app.app_emails.models import EmailOutbox, EmailStatus
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def outbox(session_factory, monkeypatch):
+	monkeypatch.setattr(tasks, "AsyncSessionLocal", session_factory)
+	async with session_factory() as db:
+		await db.execute(delete(EmailOutbox))
+		for template in ("password_reset", "password_reset", "missing_template"):
+			await enqueue_email(db, f"{uuid4().hex}@example.com", template, {"reset_url": "https://example.com/reset"})
+		db.info.pop("on_commit", None)
+		await db.commit()
+
+
+async def _statuses(session_factory):
+	async with session_factory() as db:
+		res = await db.execute(select(EmailOutbox.status, EmailOutbox.attempts).order_by(EmailOutbox.created_at))
+		return [tuple(row) for row in res.all()]
+
+
+async def test_each_email_records_its_own_outcome(session_factory, outbox, monkeypatch):
+	held = []
+
+	def send_batch(messages):
+		held.append(len(messages))
+		return [None, "provider rejected the chunk"]
+
+	monkeypatch.setattr(tasks, "send_batch", send_batch)
+
+	assert await tasks._drain() == {"sent": 1, "failed": 2}
+	assert held == [2]
+	assert sorted(await _statuses(session_factory)) == sorted([
+		(EmailStatus.sent, 0),
+		(EmailStatus.pending, 1),
+		(EmailStatus.pending, 1),
+	])
+
+
+async def test_rows_are_committed_in_flight_before_sending(session_factory, outbox, monkeypatch):
+	seen = []
+
+	def send_batch(messages):
+		seen.append(messages)
+		return [None] * len(messages)
+
+	original = tasks.asyncio.to_thread
+
+	async def to_thread(func, *args):
+		# another connection must see the claim while the provider call is running
+		seen.append(await _statuses(session_factory))
+		return await original(func, *args)
+
+	monkeypatch.setattr(tasks, "send_batch", send_batch)
+	monkeypatch.setattr(tasks.asyncio, "to_thread", to_thread)
+
+	await tasks._drain()
+
+	assert [status for status, _ in seen[0]] == [EmailStatus.sending] * 3
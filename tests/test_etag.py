@@ -0,0 +1,41 @@
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from starlette.requests import Request
+
+from app.common.etag import etag_matches, goal_etag
+from app.common.pagination import PageParams
+
+
+def _request(if_none_match=None) -> Request:
+	headers = [(b"if-none-match", if_none_match.encode())] if if_none_match is not None else []
+	return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+ETAG = '"abc"'
+
+
+@pytest.mark.parametrize("header, matches", [
+	(None, False),
+	("", False),
+	('"abc"', True),
+	('W/"abc"', True),
+	('"xyz", "abc"', True),
+	("*", True),
+	('"xyz"', False),
+	("abc", False),
+])
+def test_etag_matches(header, matches):
+	assert etag_matches(_request(header), ETAG) is matches
+
+
+def test_goal_etag_follows_version_and_page():
+	goal = SimpleNamespace(id=uuid4(), version=1)
+	page = PageParams(limit=50)
+	etag = goal_etag(goal, "tasks", page)
+	assert etag == goal_etag(goal, "tasks", page)
+	assert etag != goal_etag(goal, "weekly_reports", page)
+	assert etag != goal_etag(goal, "tasks", PageParams(limit=50, cursor="next"))
+	goal.version = 2
+	assert etag != goal_etag(goal, "tasks", page)
@@ -0,0 +1,70 @@
+import base64
+import json
+import time
+from uuid import uuid4
+
+import pytest
+
+from app.core.config import settings
+from app.lib.google_auth import GoogleKeySetCache, _token_kid
+
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeFetcher:
+	def __init__(self, *responses):
+		self.responses = list(responses)
+		self.calls = 0
+
+	def __call__(self):
+		self.calls += 1
+		return self.responses[min(self.calls, len(self.responses)) - 1]
+
+
+def _cache(fetcher):
+	# a fresh namespace keeps a running Redis from sharing certificates between tests
+	return GoogleKeySetCache(fetcher=fetcher, namespace=f"test:google:certs:{uuid4().hex}")
+
+
+async def test_certificates_are_fetched_once_while_fresh():
+	fetcher = FakeFetcher(({"kid-1": "cert-1"}, 3600))
+	cache = _cache(fetcher)
+
+	for _ in range(3):
+		key_set = await cache.get()
+
+	assert key_set.certs == {"kid-1": "cert-1"}
+	assert fetcher.calls == 1
+
+
+async def test_expired_certificates_are_refetched():
+	fetcher = FakeFetcher(({"kid-2": "cert-2"}, 3600))
+	cache = _cache(fetcher)
+	cache.set({"kid-1": "cert-1"}, 0)
+
+	key_set = await cache.get()
+
+	assert key_set.certs == {"kid-2": "cert-2"}
+	assert fetcher.calls == 1
+
+
+async def test_unknown_kid_refresh_is_throttled(monkeypatch):
+	fetcher = FakeFetcher(({"kid-1": "cert-1"}, 3600), ({"kid-1": "cert-1", "kid-2": "cert-2"}, 3600))
+	cache = _cache(fetcher)
+	await cache.get()
+
+	key_set = await cache.refresh_for_unknown_kid()
+	assert "kid-2" in key_set.certs
+	assert await cache.refresh_for_unknown_kid() is None
+	assert fetcher.calls == 2
+
+	monkeypatch.setattr(cache, "_last_forced", time.time() - settings.google_certs_min_refresh_interval_seconds - 1)
+	assert await cache.refresh_for_unknown_kid() is not None
+	assert fetcher.calls == 3
+
+
+def test_token_kid():
+	header = base64.urlsafe_b64encode(json.dumps({"alg": "RS256", "kid": "kid-1"}).encode()).decode().rstrip("=")
+	assert _token_kid(f"{header}.payload.signature") == "kid-1"
+	assert _token_kid("garbage") is None
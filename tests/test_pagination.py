@@ -0,0 +1,23 @@
+from datetime import date
+from uuid import uuid4
+
+import pytest
+
+from app.common.pagination import InvalidCursor, decode_cursor, encode_cursor
+from app.app_tasks.models import Task
+
+
+COLUMNS = (Task.assigned_date, Task.id)
+
+
+def test_cursor_round_trip():
+	values = [date(2025, 3, 1), uuid4()]
+	cursor = encode_cursor(values)
+	assert "=" not in cursor
+	assert decode_cursor(cursor, COLUMNS) == values
+
+
+@pytest.mark.parametrize("cursor", ["not base64!", encode_cursor([1]), encode_cursor(["2025-03-01", "not-a-uuid"]), "e30"])
+def test_invalid_cursor(cursor):
+	with pytest.raises(InvalidCursor):
+		decode_cursor(cursor, COLUMNS)
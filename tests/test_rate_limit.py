@@ -0,0 +1,53 @@
+from types import SimpleNamespace
+
+import pytest
+from starlette.requests import Request
+
+from app.core import rate_limit
+from app.core.config import settings
+
+
+pytestmark = pytest.mark.anyio
+
+
+def _request(path="/api/v1/auth/login", client="203.0.113.7", forwarded=None) -> Request:
+	headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+	return Request({
+		"type": "http",
+		"method": "POST",
+		"path": path,
+		"headers": headers,
+		"client": (client, 50000),
+		"route": SimpleNamespace(path=path),
+	})
+
+
+def test_forwarded_for_is_ignored_from_untrusted_clients():
+	assert rate_limit._identity(_request(forwarded="198.51.100.1")) == "ip:203.0.113.7"
+
+
+def test_forwarded_for_is_followed_through_trusted_proxies(monkeypatch):
+	monkeypatch.setattr(rate_limit, "_trusted_proxies", frozenset({"10.0.0.1", "10.0.0.2"}))
+	request = _request(client="10.0.0.1", forwarded="192.0.2.55, 198.51.100.1, 10.0.0.2")
+	assert rate_limit._identity(request) == "ip:198.51.100.1"
+
+
+async def test_buckets_are_per_route(monkeypatch):
+	leases = []
+
+	async def lease(policy, route, identity, wanted):
+		leases.append((policy.name, route, identity))
+		return 1, 60000
+
+	monkeypatch.setattr(settings, "rate_limit_enabled", True)
+	monkeypatch.setattr(rate_limit, "_lease", lease)
+	monkeypatch.setattr(rate_limit, "_buckets", {})
+	limit = rate_limit.RateLimit("auth")
+
+	await limit(_request("/api/v1/auth/login"))
+	await limit(_request("/api/v1/auth/register"))
+
+	assert leases == [
+		("auth", "POST:/api/v1/auth/login", "ip:203.0.113.7"),
+		("auth", "POST:/api/v1/auth/register", "ip:203.0.113.7"),
+	]
@@ -0,0 +1,29 @@
+from datetime import date
+from uuid import uuid4
+
+import pytest
+
+from app.app_reports.engine import ReportStats, monthly_report_request
+
+
+def _stats(**counts) -> ReportStats:
+	return ReportStats(goal_id=uuid4(), start=date(2025, 3, 2), end=date(2025, 3, 31), **counts)
+
+
+@pytest.mark.parametrize("counts, score", [
+	({}, None),
+	({"assigned": 3}, None),
+	({"done": 3, "missed": 1}, 75.0),
+	({"done": 3, "missed": 1, "recent_done": 3, "recent_missed": 1}, 75.0),
+	# recent 1/2 weighted 0.4, prior 8/10 weighted 0.6
+	({"done": 9, "missed": 3, "recent_done": 1, "recent_missed": 1}, 68.0),
+	({"done": 0, "missed": 4, "recent_done": 0, "recent_missed": 2}, 0.0),
+])
+def test_performance_score(counts, score):
+	assert _stats(**counts).performance_score == score
+
+
+def test_monthly_report_uses_the_month_the_window_mostly_covers():
+	stats = ReportStats(goal_id=uuid4(), start=date(2025, 2, 20), end=date(2025, 3, 21), done=1)
+	request = monthly_report_request(stats)
+	assert (request.month, request.year) == (3, 2025)